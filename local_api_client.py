@@ -0,0 +1,33 @@
+"""
+Shared client settings for the local API test scripts
+Pooled httpx clients for the FastAPI servers run from this repo
+(main.py on :8000, gemini_api.py on :8001)
+"""
+
+import httpx
+
+# Optional: orjson decodes response bodies several times faster than the stdlib
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+MAIN_API_URL = "http://localhost:8000"
+GEMINI_API_URL = "http://localhost:8001"
+
+# Fail fast when the server is down, but give slow (Gemini-backed) responses time to answer
+TIMEOUT = httpx.Timeout(connect=2.0, read=30.0, write=5.0, pool=1.0)
+LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100)
+
+def async_client(base_url: str = GEMINI_API_URL) -> httpx.AsyncClient:
+    """Pooled async client for one local server (use with `async with`)"""
+    return httpx.AsyncClient(base_url=base_url, timeout=TIMEOUT, limits=LIMITS)
+
+def sync_client(base_url: str = MAIN_API_URL) -> httpx.Client:
+    """Pooled blocking client for one local server (use with `with`)"""
+    return httpx.Client(base_url=base_url, timeout=TIMEOUT, limits=LIMITS)
+
+def fast_json(response: httpx.Response):
+    """Decode a response's JSON body straight from its bytes, with orjson when available"""
+    return orjson.loads(response.content) if ORJSON_AVAILABLE else response.json()
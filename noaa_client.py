@@ -0,0 +1,46 @@
+"""
+Shared NOAA HTTP client
+Single httpx.AsyncClient reused by the NOAA pressure scripts, so connections
+(and TLS sessions) to api.weather.gov are pooled across every request
+"""
+
+import asyncio
+from importlib.util import find_spec
+
+import httpx
+
+# Optional: HTTP/2 multiplexes concurrent requests over one connection
+# (pip install httpx[http2])
+HTTP2_AVAILABLE = find_spec("h2") is not None
+
+# Optional: libuv-based event loop (installed with uvicorn[standard]; not on Windows)
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+TIMEOUT = 60.0
+LIMITS = httpx.Limits(max_keepalive_connections=20, keepalive_expiry=60)
+
+_client = None
+
+async def get_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it on first use (or after close_client)"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(http2=HTTP2_AVAILABLE, timeout=TIMEOUT, limits=LIMITS)
+    return _client
+
+async def close_client() -> None:
+    """Close the shared client and its pooled connections"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+def run(main):
+    """Run a coroutine to completion on uvloop when available, else on asyncio's default loop"""
+    loop_factory = uvloop.new_event_loop if UVLOOP_AVAILABLE else None
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        return runner.run(main)
@@ -0,0 +1,153 @@
+"""
+NOAA Pressure Data Access
+Cached coroutines for the points -> gridpoints -> stations flow shared by the
+NOAA surface pressure scripts. Every request goes through the shared client
+(noaa_client.py) with retries, the on-disk response cache and, when
+async-lru is installed, an in-process cache, so scripts run in one session
+never fetch the same resource twice.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+import io
+import sys
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from noaa_client import get_client
+
+# Optional: orjson decodes the (large) GeoJSON responses several times faster.
+# Both parse the raw response bytes, so the stdlib is a drop-in fallback.
+try:
+    import orjson as json
+except ImportError:
+    import json
+
+# Optional: persistent on-disk response cache, so repeated runs skip the network
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+# Optional: in-process cache of the decoded responses
+try:
+    from async_lru import alru_cache
+    ALRU_AVAILABLE = True
+except ImportError:
+    ALRU_AVAILABLE = False
+
+    def alru_cache(maxsize=128, ttl=None):
+        """No-op stand-in when async-lru is missing (the disk cache still applies)"""
+        return lambda fn: fn
+
+BASE_URL = "https://api.weather.gov"
+
+# Latest-observation endpoint for one station
+STATION_LATEST_URL = BASE_URL + "/stations/{station_id}/observations/latest"
+
+# Prefix NOAA puts on every WMO unit code ("wmoUnit:Pa")
+UNIT_PREFIX = "wmoUnit:"
+
+# Response cache lifetimes (seconds): point lookups are static, grid
+# forecasts update hourly, station observations every few minutes
+POINT_TTL = 24 * 3600
+GRID_TTL = 3600
+OBSERVATION_TTL = 300
+
+# In-process cache size and lifetime (seconds)
+MEMO_SIZE = 64
+MEMO_TTL = 300
+
+# Retry policy for transient failures (connection errors, throttling, 5xx)
+RETRY_TRIES = 3
+RETRY_DELAY = 0.3
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Directory of the on-disk response cache
+RESPONSE_CACHE_DIR = ".noaa_cache"
+
+_response_cache = None
+
+def get_response_cache() -> Optional["diskcache.Cache"]:
+    """Return the on-disk response cache, opening it on first use (None without diskcache)"""
+    global _response_cache
+    if _response_cache is None and DISKCACHE_AVAILABLE:
+        _response_cache = diskcache.Cache(RESPONSE_CACHE_DIR)
+    return _response_cache
+
+def flush_section(out: io.StringIO) -> None:
+    """Write a buffered report section to stdout in a single call"""
+    sys.stdout.write(out.getvalue())
+    sys.stdout.flush()
+
+def parse_valid_time(valid_time: str) -> datetime:
+    """Parse the start of a NOAA validTime interval ("<start>/<duration>") as an aware datetime"""
+    return datetime.fromisoformat(valid_time.split("/", 1)[0].replace("Z", "+00:00"))
+
+def epoch_ns(dt: datetime) -> int:
+    """Exact integer nanoseconds since the Unix epoch for an aware datetime"""
+    return (dt - EPOCH) // timedelta(microseconds=1) * 1000
+
+async def get_with_retry(client: httpx.AsyncClient, url: str,
+                         tries: int = RETRY_TRIES, delay: float = RETRY_DELAY) -> httpx.Response:
+    """GET a URL, retrying transient failures with exponential backoff (0.3s, 0.6s, ...)"""
+    for attempt in range(tries):
+        try:
+            response = await client.get(url)
+            if response.status_code not in RETRY_STATUS or attempt == tries - 1:
+                return response
+        except httpx.TransportError:
+            if attempt == tries - 1:
+                raise
+        await asyncio.sleep(delay * 2 ** attempt)
+
+async def get_json(url: str, ttl: int) -> Dict[str, Any]:
+    """GET a NOAA URL and decode its JSON body, served from the disk cache while fresh"""
+    cache = get_response_cache()
+    if cache is not None:
+        content = cache.get(url)
+        if content is not None:
+            return json.loads(content)
+
+    response = await get_with_retry(await get_client(), url)
+    response.raise_for_status()
+    if cache is not None:
+        cache.set(url, response.content, expire=ttl)
+    return json.loads(response.content)
+
+@alru_cache(maxsize=MEMO_SIZE, ttl=MEMO_TTL)
+async def get_grid_info(lat: float, lon: float) -> Dict[str, Any]:
+    """Get the /points properties (grid id and coordinates, endpoint URLs) for a location"""
+    data = await get_json(f"{BASE_URL}/points/{lat},{lon}", POINT_TTL)
+    return data.get("properties", {})
+
+@alru_cache(maxsize=MEMO_SIZE, ttl=MEMO_TTL)
+async def get_grid_data(grid_id: str, grid_x: int, grid_y: int) -> Dict[str, Any]:
+    """Get every forecast parameter of a grid point"""
+    data = await get_json(f"{BASE_URL}/gridpoints/{grid_id}/{grid_x},{grid_y}", GRID_TTL)
+    return data.get("properties", {})
+
+async def get_pressure_forecast(grid_id: str, grid_x: int, grid_y: int) -> Optional[Dict[str, Any]]:
+    """Get the grid point pressure series ({"uom", "values": [{"validTime", "value"}]}), if any"""
+    return (await get_grid_data(grid_id, grid_x, grid_y)).get("pressure")
+
+@alru_cache(maxsize=MEMO_SIZE, ttl=MEMO_TTL)
+async def get_grid_stations(grid_id: str, grid_x: int, grid_y: int) -> List[str]:
+    """Get the identifiers of the observation stations serving a grid point, nearest first"""
+    data = await get_json(f"{BASE_URL}/gridpoints/{grid_id}/{grid_x},{grid_y}/stations", GRID_TTL)
+    return [
+        station_id for station_id in (
+            feature.get("properties", {}).get("stationIdentifier")
+            for feature in data.get("features", [])
+        ) if station_id
+    ]
+
+@alru_cache(maxsize=MEMO_SIZE, ttl=MEMO_TTL)
+async def get_station_latest(station_id: str) -> Dict[str, Any]:
+    """Get the latest observation properties of a station"""
+    data = await get_json(STATION_LATEST_URL.format(station_id=station_id), OBSERVATION_TTL)
+    return data.get("properties", {})
@@ -5,18 +5,54 @@ Adds surface pressure data retrieval with custom time ranges to the Zeus Air Qua
 
 from fastapi import HTTPException
 import httpx
+from contextlib import nullcontext
+from importlib.util import find_spec
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Union
 import logging
 
+# Optional: HTTP/2 multiplexes concurrent requests over one connection
+# (pip install httpx[http2])
+HTTP2_AVAILABLE = find_spec("h2") is not None
+
 logger = logging.getLogger(__name__)
 
+# Keep-alive pool for the API's own clients
+LIMITS = httpx.Limits(max_keepalive_connections=10, keepalive_expiry=30)
+
 class NOAASurfacePressureAPI:
     """Handler for NOAA surface pressure data with custom time ranges"""
     
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
         self.base_url = "https://api.weather.gov"
         self.timeout = 60.0
+        # Optional caller-owned client, reused (and left open) across calls;
+        # without one, each call opens and closes its own client unless the
+        # API is used as an async context manager
+        self.client = client
+        self._owns_client = False
+    
+    async def __aenter__(self):
+        """Open one long-lived client shared by every call until exit (unless one was injected)"""
+        if self.client is None:
+            self.client = self._new_client()
+            self._owns_client = True
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self._owns_client:
+            await self.client.aclose()
+            self.client = None
+            self._owns_client = False
+    
+    def _new_client(self) -> httpx.AsyncClient:
+        """Create a pooled client; NOAA redirects non-canonical point URLs, so follow them"""
+        return httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=self.timeout,
+            limits=LIMITS,
+            follow_redirects=True
+        )
     
     async def get_surface_pressure_data(
         self,
@@ -62,7 +98,8 @@ class NOAASurfacePressureAPI:
             }
         }
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        session = nullcontext(self.client) if self.client is not None else self._new_client()
+        async with session as client:
             try:
                 # Step 1: Get NOAA grid information
                 grid_info = await self._get_grid_info(client, lat, lon)
@@ -4,7 +4,10 @@ Data Visualization Script for Air Quality Dataset
 Analyzes and visualizes the collected air quality data.
 """
 
-import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pacsv
+import matplotlib
+matplotlib.use('Agg')  # Non-interactive backend: plots are only saved to disk
 import matplotlib.pyplot as plt
 from pathlib import Path
 from datetime import datetime
@@ -12,6 +15,36 @@ from datetime import datetime
 # Configuration
 DATA_FILE = Path("data/air_quality_dataset.csv")
 
+# Explicit column types so the Arrow CSV reader skips type inference.
+# String columns are dictionary-encoded (the CSV reader requires int32 indices).
+_LABEL = pa.dictionary(pa.int32(), pa.string())
+COLUMN_TYPES = {
+    "timestamp": pa.timestamp("us", "UTC"),
+    "source": _LABEL,
+    "location_name": _LABEL,
+    "latitude": pa.float64(),
+    "longitude": pa.float64(),
+    "parameter": _LABEL,
+    "value": pa.float64(),
+    "unit": _LABEL,
+    "aqi": pa.float64(),
+    "temperature": pa.float64(),
+    "humidity": pa.float64(),
+    "wind_speed": pa.float64(),
+    "wind_deg": pa.float64(),
+    "pressure": pa.float64(),
+}
+
+# Single figure reused by every chart (cleared between plots)
+_FIG = plt.figure()
+
+
+def _reset_figure(figsize, nrows=1, ncols=1, **kwargs):
+    """Clear the shared figure, resize it and return fresh subplot axes."""
+    _FIG.clf()
+    _FIG.set_size_inches(*figsize)
+    return _FIG.subplots(nrows, ncols, **kwargs)
+
 
 def load_data():
     """Load the collected air quality dataset."""
@@ -20,12 +53,19 @@ def load_data():
         print("Run: python collect_air_quality_data.py")
         return None
     
-    df = pd.read_csv(DATA_FILE, parse_dates=["timestamp"])
+    table = pacsv.read_csv(
+        DATA_FILE,
+        convert_options=pacsv.ConvertOptions(
+            column_types=COLUMN_TYPES,
+            timestamp_parsers=[pacsv.ISO8601],
+        ),
+    )
+    df = table.to_pandas(self_destruct=True)
     print(f"✓ Loaded {len(df)} records from {DATA_FILE}")
     return df
 
 
-def print_summary(df):
+def print_summary(df, groups, aqi):
     """Print summary statistics."""
     print("\n" + "=" * 80)
     print("DATASET SUMMARY")
@@ -47,10 +87,10 @@ def print_summary(df):
         print(f"   {source}: {count} records")
     
     print(f"\n☁️ Pollutants:")
-    for param in df['parameter'].unique():
-        count = len(df[df['parameter'] == param])
-        avg_value = df[df['parameter'] == param]['value'].mean()
-        unit = df[df['parameter'] == param]['unit'].iloc[0]
+    for param, param_data in groups:
+        count = len(param_data)
+        avg_value = param_data['value'].mean()
+        unit = param_data['unit'].iloc[0]
         print(f"   {param:8s}: {count:4d} records, avg={avg_value:8.2f} {unit}")
     
     print(f"\n🌡️ Weather Context:")
@@ -62,32 +102,30 @@ def print_summary(df):
         print("   (No weather data available)")
     
     print(f"\n📊 AQI Distribution:")
-    if df['aqi'].notna().any():
-        aqi_counts = df['aqi'].value_counts().sort_index()
+    if not aqi.empty:
+        aqi_counts = aqi.value_counts().sort_index()
+        aqi_total = len(aqi)
         aqi_labels = {1: "Good", 2: "Fair", 3: "Moderate", 4: "Poor", 5: "Very Poor"}
         for aqi_val, count in aqi_counts.items():
-            pct = (count / df['aqi'].notna().sum()) * 100
+            pct = (count / aqi_total) * 100
             print(f"   AQI {aqi_val} ({aqi_labels.get(int(aqi_val), 'Unknown')}): {count} records ({pct:.1f}%)")
     else:
         print("   (No AQI data available)")
 
 
-def plot_pollutant_trends(df):
+def plot_pollutant_trends(groups):
     """Plot pollutant concentration trends over time."""
     print("\n📈 Generating pollutant trend charts...")
     
-    # Get unique parameters
-    parameters = df['parameter'].unique()
-    
-    # Create figure with subplots
-    n_params = len(parameters)
-    fig, axes = plt.subplots(n_params, 1, figsize=(12, 3 * n_params), sharex=True)
+    # Create figure with one subplot per parameter
+    n_params = groups.ngroups
+    axes = _reset_figure((12, 3 * n_params), n_params, 1, sharex=True)
     
     if n_params == 1:
         axes = [axes]
     
-    for ax, param in zip(axes, parameters):
-        param_data = df[df['parameter'] == param].sort_values('timestamp')
+    for ax, (param, param_data) in zip(axes, groups):
+        param_data = param_data.sort_values('timestamp')
         
         if len(param_data) > 0:
             ax.plot(param_data['timestamp'], param_data['value'], marker='o', markersize=2)
@@ -96,19 +134,19 @@ def plot_pollutant_trends(df):
             ax.grid(True, alpha=0.3)
     
     axes[-1].set_xlabel('Time')
-    plt.tight_layout()
-    plt.savefig('data/pollutant_trends.png', dpi=150)
+    _FIG.tight_layout()
+    _FIG.savefig('data/pollutant_trends.png', dpi=150)
     print(f"✓ Saved: data/pollutant_trends.png")
 
 
-def plot_aqi_distribution(df):
+def plot_aqi_distribution(aqi):
     """Plot AQI distribution."""
-    if df['aqi'].notna().any():
+    if not aqi.empty:
         print("\n📊 Generating AQI distribution chart...")
         
-        fig, ax = plt.subplots(figsize=(10, 6))
+        ax = _reset_figure((10, 6))
         
-        aqi_counts = df['aqi'].value_counts().sort_index()
+        aqi_counts = aqi.value_counts().sort_index()
         aqi_labels = {1: "Good", 2: "Fair", 3: "Moderate", 4: "Poor", 5: "Very Poor"}
         
         colors = ['#00e400', '#ffff00', '#ff7e00', '#ff0000', '#8f3f97']
@@ -125,14 +163,10 @@ def plot_aqi_distribution(df):
         ax.grid(True, alpha=0.3, axis='y')
         
         # Add value labels on bars
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                   f'{int(height)}',
-                   ha='center', va='bottom')
+        ax.bar_label(bars, fmt='%d', padding=2)
         
-        plt.tight_layout()
-        plt.savefig('data/aqi_distribution.png', dpi=150)
+        _FIG.tight_layout()
+        _FIG.savefig('data/aqi_distribution.png', dpi=150)
         print(f"✓ Saved: data/aqi_distribution.png")
 
 
@@ -145,13 +179,14 @@ def plot_pollutant_correlation(df):
         values='value',
         index='timestamp',
         columns='parameter',
-        aggfunc='mean'
+        aggfunc='mean',
+        observed=True
     )
     
     if len(pivot_df.columns) > 1:
         correlation = pivot_df.corr()
         
-        fig, ax = plt.subplots(figsize=(10, 8))
+        ax = _reset_figure((10, 8))
         im = ax.imshow(correlation, cmap='coolwarm', vmin=-1, vmax=1)
         
         # Set ticks and labels
@@ -161,7 +196,7 @@ def plot_pollutant_correlation(df):
         ax.set_yticklabels(correlation.columns)
         
         # Add colorbar
-        cbar = plt.colorbar(im, ax=ax)
+        cbar = _FIG.colorbar(im, ax=ax)
         cbar.set_label('Correlation Coefficient')
         
         # Add correlation values
@@ -171,12 +206,12 @@ def plot_pollutant_correlation(df):
                              ha="center", va="center", color="black", fontsize=10)
         
         ax.set_title('Pollutant Correlation Matrix')
-        plt.tight_layout()
-        plt.savefig('data/pollutant_correlation.png', dpi=150)
+        _FIG.tight_layout()
+        _FIG.savefig('data/pollutant_correlation.png', dpi=150)
         print(f"✓ Saved: data/pollutant_correlation.png")
 
 
-def export_summary_report(df):
+def export_summary_report(df, groups, aqi):
     """Export a text summary report."""
     print("\n📄 Generating summary report...")
     
@@ -198,8 +233,7 @@ def export_summary_report(df):
         f.write("\n")
         
         f.write("Pollutant Statistics:\n")
-        for param in df['parameter'].unique():
-            param_data = df[df['parameter'] == param]
+        for param, param_data in groups:
             f.write(f"\n{param}:\n")
             f.write(f"  Count:   {len(param_data)}\n")
             f.write(f"  Mean:    {param_data['value'].mean():.2f} {param_data['unit'].iloc[0]}\n")
@@ -207,12 +241,13 @@ def export_summary_report(df):
             f.write(f"  Min:     {param_data['value'].min():.2f}\n")
             f.write(f"  Max:     {param_data['value'].max():.2f}\n")
         
-        if df['aqi'].notna().any():
+        if not aqi.empty:
             f.write("\nAir Quality Index Distribution:\n")
-            aqi_counts = df['aqi'].value_counts().sort_index()
+            aqi_counts = aqi.value_counts().sort_index()
+            aqi_total = len(aqi)
             aqi_labels = {1: "Good", 2: "Fair", 3: "Moderate", 4: "Poor", 5: "Very Poor"}
             for aqi_val, count in aqi_counts.items():
-                pct = (count / df['aqi'].notna().sum()) * 100
+                pct = (count / aqi_total) * 100
                 f.write(f"  AQI {aqi_val} ({aqi_labels.get(int(aqi_val), 'Unknown')}): {count} ({pct:.1f}%)\n")
     
     print(f"✓ Saved: {report_file}")
@@ -229,15 +264,21 @@ def main():
     if df is None:
         return
     
+    # Group once by parameter; reused by the summary, trends and report
+    groups = df.groupby('parameter', sort=False, observed=True)
+    
+    # Valid AQI readings, masked once and shared by every AQI section
+    aqi = df.loc[df['aqi'].notna(), 'aqi']
+    
     # Print summary
-    print_summary(df)
+    print_summary(df, groups, aqi)
     
     # Generate visualizations
     try:
-        plot_pollutant_trends(df)
-        plot_aqi_distribution(df)
+        plot_pollutant_trends(groups)
+        plot_aqi_distribution(aqi)
         plot_pollutant_correlation(df)
-        export_summary_report(df)
+        export_summary_report(df, groups, aqi)
         
         print("\n" + "=" * 80)
         print("✓ ANALYSIS COMPLETE")
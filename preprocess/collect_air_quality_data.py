@@ -10,15 +10,21 @@ Designed to be modular for scheduling with cron/Prefect/Airflow.
 """
 
 import asyncio
+import functools
 import logging
 import os
-from datetime import datetime, timezone
+import time
+from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 import json
 
 import httpx
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import csv as pacsv
 from httpx import AsyncClient, HTTPStatusError, RequestError
 
 # =============================================================================
@@ -63,6 +69,86 @@ class Config:
     DEFAULT_RADIUS = 25000  # 25km for OpenAQ
     DEFAULT_LOCATION = {"lat": 40.7128, "lon": -74.0060}  # NYC
 
+# Request parts that never change between calls
+_OPENAQ_HEADERS = {"X-API-Key": Config.OPENAQ_API_KEY} if Config.OPENAQ_API_KEY else {}
+
+_TEMPO_STATIC_PARAMS = {
+    "f": "json",
+    "geometryType": "esriGeometryPoint",
+    "returnGeometry": "false",
+    "returnCatalogItems": "false",
+}
+
+
+@functools.lru_cache(maxsize=64)
+def _tempo_geom(lat: float, lon: float) -> str:
+    """JSON point geometry for the TEMPO identify endpoint (cached per coordinate)."""
+    return json.dumps({"x": lon, "y": lat, "spatialReference": {"wkid": 4326}})
+
+# =============================================================================
+# MEASUREMENT SCHEMA
+# =============================================================================
+
+# Unified schema shared by all data sources. Fetchers build one Python list per
+# column (structure-of-arrays) and normalize_data() turns them into a single
+# Arrow RecordBatch with typed builders instead of inferring dtypes row by row.
+# Timestamps are stored as integer epoch microseconds (UTC) and converted in
+# bulk by the Arrow builder.
+SCHEMA = pa.schema([
+    ("timestamp", pa.timestamp("us", "UTC")),
+    ("source", pa.dictionary(pa.int8(), pa.string())),
+    ("location_name", pa.string()),
+    ("latitude", pa.float64()),
+    ("longitude", pa.float64()),
+    ("parameter", pa.dictionary(pa.int8(), pa.string())),
+    ("value", pa.float64()),
+    ("unit", pa.dictionary(pa.int8(), pa.string())),
+    ("aqi", pa.float64()),
+    ("temperature", pa.float64()),
+    ("humidity", pa.float64()),
+    ("wind_speed", pa.float64()),
+    ("wind_deg", pa.float64()),
+    ("pressure", pa.float64()),
+])
+
+COLUMNS = SCHEMA.names
+
+Columns = Dict[str, List[Any]]
+
+
+def new_columns() -> Columns:
+    """Return an empty column-oriented measurement batch."""
+    return {col: [] for col in COLUMNS}
+
+
+def append_measurement(columns: Columns, **values: Any) -> None:
+    """Append one measurement to a column batch; missing fields become None."""
+    for col in COLUMNS:
+        columns[col].append(values.get(col))
+
+
+def epoch_us(seconds: float) -> int:
+    """Convert epoch seconds to the integer microseconds used in SCHEMA."""
+    return int(seconds * 1_000_000)
+
+
+def num_rows(columns: Columns) -> int:
+    """Number of measurements held in a column batch."""
+    return len(columns["timestamp"])
+
+
+# Columns identifying a unique measurement when merging with existing data
+KEY_COLS = ["timestamp", "source", "latitude", "longitude", "parameter"]
+
+# Plain (non-dictionary) key types used to anti-join new rows against history
+KEY_SCHEMA = pa.schema([
+    ("timestamp", pa.timestamp("us", "UTC")),
+    ("source", pa.string()),
+    ("latitude", pa.float64()),
+    ("longitude", pa.float64()),
+    ("parameter", pa.string()),
+])
+
 # =============================================================================
 # DATA FETCHING FUNCTIONS
 # =============================================================================
@@ -72,7 +158,7 @@ async def fetch_openaq_data(
     lon: float,
     radius: int = Config.DEFAULT_RADIUS,
     client: Optional[AsyncClient] = None
-) -> List[Dict[str, Any]]:
+) -> Columns:
     """
     Fetch ground station air quality measurements from OpenAQ API.
     
@@ -83,7 +169,7 @@ async def fetch_openaq_data(
         client: Optional httpx AsyncClient (will create if not provided)
     
     Returns:
-        List of normalized measurement dictionaries
+        Column-oriented batch of normalized measurements
     """
     logger.info(f"Fetching OpenAQ data for location ({lat}, {lon}) with radius {radius}m")
     
@@ -92,28 +178,24 @@ async def fetch_openaq_data(
         client = AsyncClient(timeout=Config.TIMEOUT)
         should_close = True
     
-    measurements = []
+    measurements = new_columns()
     
     try:
         # OpenAQ v3 locations endpoint
         url = f"{Config.OPENAQ_BASE_URL}/locations/latest"
         
-        headers = {}
-        if Config.OPENAQ_API_KEY:
-            headers["X-API-Key"] = Config.OPENAQ_API_KEY
-        
         params = {
             "coordinates": f"{lat},{lon}",
             "radius": radius,
             "limit": 100
         }
         
-        response = await client.get(url, params=params, headers=headers)
+        response = await client.get(url, params=params, headers=_OPENAQ_HEADERS)
         response.raise_for_status()
         data = response.json()
         
         if "results" in data and data["results"]:
-            timestamp = datetime.now(timezone.utc).isoformat()
+            timestamp = time.time_ns() // 1000
             
             for location in data["results"]:
                 location_lat = location.get("coordinates", {}).get("latitude")
@@ -125,20 +207,20 @@ async def fetch_openaq_data(
                     parameter = sensor.get("parameter", {})
                     param_name = parameter.get("name", "").upper()
                     
-                    measurement = {
-                        "timestamp": timestamp,
-                        "source": "openaq",
-                        "location_name": location_name,
-                        "latitude": location_lat,
-                        "longitude": location_lon,
-                        "parameter": param_name,
-                        "value": sensor.get("latest", {}).get("value"),
-                        "unit": parameter.get("units", ""),
-                        "aqi": None,  # OpenAQ doesn't provide AQI directly
-                    }
-                    measurements.append(measurement)
+                    append_measurement(
+                        measurements,
+                        timestamp=timestamp,
+                        source="openaq",
+                        location_name=location_name,
+                        latitude=location_lat,
+                        longitude=location_lon,
+                        parameter=param_name,
+                        value=sensor.get("latest", {}).get("value"),
+                        unit=parameter.get("units", ""),
+                        aqi=None,  # OpenAQ doesn't provide AQI directly
+                    )
             
-            logger.info(f"Successfully fetched {len(measurements)} measurements from OpenAQ")
+            logger.info(f"Successfully fetched {num_rows(measurements)} measurements from OpenAQ")
         else:
             logger.warning("No OpenAQ data found for specified location")
     
@@ -160,7 +242,7 @@ async def fetch_tempo_data(
     lon: float,
     time_range: Optional[str] = None,
     client: Optional[AsyncClient] = None
-) -> List[Dict[str, Any]]:
+) -> Columns:
     """
     Fetch NASA TEMPO NO₂ satellite measurements.
     
@@ -171,7 +253,7 @@ async def fetch_tempo_data(
         client: Optional httpx AsyncClient
     
     Returns:
-        List of normalized measurement dictionaries
+        Column-oriented batch of normalized measurements
     """
     logger.info(f"Fetching TEMPO NO₂ data for location ({lat}, {lon})")
     
@@ -180,18 +262,12 @@ async def fetch_tempo_data(
         client = AsyncClient(timeout=Config.TIMEOUT)
         should_close = True
     
-    measurements = []
+    measurements = new_columns()
     
     try:
         url = f"{Config.TEMPO_BASE_URL}/identify"
         
-        params = {
-            "f": "json",
-            "geometryType": "esriGeometryPoint",
-            "geometry": json.dumps({"x": lon, "y": lat, "spatialReference": {"wkid": 4326}}),
-            "returnGeometry": "false",
-            "returnCatalogItems": "false",
-        }
+        params = {**_TEMPO_STATIC_PARAMS, "geometry": _tempo_geom(lat, lon)}
         
         if time_range:
             params["time"] = time_range
@@ -201,25 +277,25 @@ async def fetch_tempo_data(
         data = response.json()
         
         if "value" in data:
-            timestamp = datetime.now(timezone.utc).isoformat()
+            timestamp = time.time_ns() // 1000
             
             # Extract location from response
             location = data.get("location", {})
             actual_lon = location.get("x", lon)
             actual_lat = location.get("y", lat)
             
-            measurement = {
-                "timestamp": timestamp,
-                "source": "tempo",
-                "location_name": "TEMPO Satellite",
-                "latitude": actual_lat,
-                "longitude": actual_lon,
-                "parameter": "NO2",
-                "value": float(data["value"]) if data["value"] else None,
-                "unit": "molecules/cm²",
-                "aqi": None,  # TEMPO doesn't provide AQI
-            }
-            measurements.append(measurement)
+            append_measurement(
+                measurements,
+                timestamp=timestamp,
+                source="tempo",
+                location_name="TEMPO Satellite",
+                latitude=actual_lat,
+                longitude=actual_lon,
+                parameter="NO2",
+                value=float(data["value"]) if data["value"] else None,
+                unit="molecules/cm²",
+                aqi=None,  # TEMPO doesn't provide AQI
+            )
             
             logger.info(f"Successfully fetched TEMPO NO₂ measurement: {data['value']}")
         else:
@@ -242,7 +318,7 @@ async def fetch_openweather_forecast(
     lat: float,
     lon: float,
     client: Optional[AsyncClient] = None
-) -> List[Dict[str, Any]]:
+) -> Columns:
     """
     Fetch air quality forecast and weather context from OpenWeatherMap.
     
@@ -252,7 +328,7 @@ async def fetch_openweather_forecast(
         client: Optional httpx AsyncClient
     
     Returns:
-        List of normalized forecast dictionaries with weather context
+        Column-oriented batch of normalized forecasts with weather context
     """
     logger.info(f"Fetching OpenWeatherMap forecast for location ({lat}, {lon})")
     
@@ -261,7 +337,7 @@ async def fetch_openweather_forecast(
         client = AsyncClient(timeout=Config.TIMEOUT)
         should_close = True
     
-    measurements = []
+    measurements = new_columns()
     
     try:
         # Fetch air quality forecast
@@ -306,7 +382,7 @@ async def fetch_openweather_forecast(
         if "list" in aq_data:
             for forecast_item in aq_data["list"]:
                 forecast_time = forecast_item.get("dt")
-                timestamp = datetime.fromtimestamp(forecast_time, tz=timezone.utc).isoformat()
+                timestamp = epoch_us(forecast_time)
                 
                 # Get corresponding weather data
                 weather_context = weather_lookup.get(forecast_time, {})
@@ -330,25 +406,21 @@ async def fetch_openweather_forecast(
                 
                 for pollutant, value in pollutants.items():
                     if value is not None:
-                        measurement = {
-                            "timestamp": timestamp,
-                            "source": "openweather_forecast",
-                            "location_name": "OpenWeatherMap Forecast",
-                            "latitude": lat,
-                            "longitude": lon,
-                            "parameter": pollutant,
-                            "value": value,
-                            "unit": "μg/m³",
-                            "aqi": aqi,
-                            "temperature": weather_context.get("temperature"),
-                            "humidity": weather_context.get("humidity"),
-                            "wind_speed": weather_context.get("wind_speed"),
-                            "wind_deg": weather_context.get("wind_deg"),
-                            "pressure": weather_context.get("pressure"),
-                        }
-                        measurements.append(measurement)
+                        append_measurement(
+                            measurements,
+                            timestamp=timestamp,
+                            source="openweather_forecast",
+                            location_name="OpenWeatherMap Forecast",
+                            latitude=lat,
+                            longitude=lon,
+                            parameter=pollutant,
+                            value=value,
+                            unit="μg/m³",
+                            aqi=aqi,
+                            **weather_context,
+                        )
             
-            logger.info(f"Successfully fetched {len(measurements)} forecast measurements from OpenWeatherMap")
+            logger.info(f"Successfully fetched {num_rows(measurements)} forecast measurements from OpenWeatherMap")
         else:
             logger.warning("No forecast data available from OpenWeatherMap")
     
@@ -368,59 +440,31 @@ async def fetch_openweather_forecast(
 # DATA NORMALIZATION
 # =============================================================================
 
-def normalize_data(measurements: List[Dict[str, Any]]) -> pd.DataFrame:
+def normalize_data(batches: List[Columns]) -> pd.DataFrame:
     """
     Normalize all API responses into a unified Pandas DataFrame.
     
     Args:
-        measurements: List of measurement dictionaries from various sources
+        batches: Column-oriented measurement batches from various sources
     
     Returns:
         Normalized Pandas DataFrame with consistent schema
     """
-    logger.info(f"Normalizing {len(measurements)} measurements into DataFrame")
+    merged = new_columns()
+    for batch in batches:
+        for col in COLUMNS:
+            merged[col].extend(batch[col])
+    
+    total = num_rows(merged)
+    logger.info(f"Normalizing {total} measurements into DataFrame")
     
-    if not measurements:
+    if total == 0:
         logger.warning("No measurements to normalize")
         return pd.DataFrame()
     
-    # Create DataFrame
-    df = pd.DataFrame(measurements)
-    
-    # Ensure consistent column order and types
-    column_order = [
-        "timestamp",
-        "source",
-        "location_name",
-        "latitude",
-        "longitude",
-        "parameter",
-        "value",
-        "unit",
-        "aqi",
-        "temperature",
-        "humidity",
-        "wind_speed",
-        "wind_deg",
-        "pressure"
-    ]
-    
-    # Add missing columns with None values
-    for col in column_order:
-        if col not in df.columns:
-            df[col] = None
-    
-    # Reorder columns
-    df = df[column_order]
-    
-    # Convert timestamp to datetime
-    df["timestamp"] = pd.to_datetime(df["timestamp"])
-    
-    # Convert numeric columns
-    numeric_cols = ["latitude", "longitude", "value", "aqi", "temperature", 
-                    "humidity", "wind_speed", "wind_deg", "pressure"]
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
+    # Build typed Arrow columns in one pass, then hand the buffers to pandas
+    batch = pa.RecordBatch.from_pydict(merged, schema=SCHEMA)
+    df = batch.to_pandas(self_destruct=True)
     
     # Sort by timestamp
     df = df.sort_values("timestamp").reset_index(drop=True)
@@ -436,6 +480,50 @@ def normalize_data(measurements: List[Dict[str, Any]]) -> pd.DataFrame:
 # DATA STORAGE
 # =============================================================================
 
+def _nan_coords(keys: pa.Table) -> pa.Table:
+    """Replace missing coordinates with NaN so they match in key joins (nulls never do)."""
+    for name in ("latitude", "longitude"):
+        idx = keys.schema.get_field_index(name)
+        keys = keys.set_column(idx, name, pc.fill_null(keys[name], float("nan")))
+    return keys
+
+
+def read_existing_keys(filepath: Path) -> pa.Table:
+    """
+    Read only the key columns of an existing CSV dataset.
+    
+    Args:
+        filepath: Path to the CSV file
+    
+    Returns:
+        Arrow table with KEY_COLS
+    """
+    return _nan_coords(pacsv.read_csv(
+        filepath,
+        convert_options=pacsv.ConvertOptions(
+            include_columns=KEY_COLS,
+            column_types=dict(zip(KEY_SCHEMA.names, KEY_SCHEMA.types)),
+            timestamp_parsers=[pacsv.ISO8601],
+        ),
+    ))
+
+
+def drop_existing_measurements(df: pd.DataFrame, existing_keys: pa.Table) -> pd.DataFrame:
+    """
+    Drop rows whose key already exists in the stored history (anti-join).
+    
+    Args:
+        df: New measurements
+        existing_keys: Key columns of the stored history
+    
+    Returns:
+        Rows of df not present in existing_keys
+    """
+    new_keys = _nan_coords(pa.Table.from_pandas(df[KEY_COLS], preserve_index=False).cast(KEY_SCHEMA))
+    new_keys = new_keys.append_column("_row", pa.array(np.arange(len(df))))
+    fresh = new_keys.join(existing_keys, keys=KEY_COLS, join_type="left anti")
+    return df.iloc[np.sort(fresh["_row"].to_numpy())]
+
 def save_to_csv(df: pd.DataFrame, filename: str = Config.OUTPUT_FILE, append: bool = True) -> None:
     """
     Save DataFrame to CSV file.
@@ -456,19 +544,14 @@ def save_to_csv(df: pd.DataFrame, filename: str = Config.OUTPUT_FILE, append: bo
     
     try:
         if append and filepath.exists():
-            # Load existing data
-            existing_df = pd.read_csv(filepath, parse_dates=["timestamp"])
-            
-            # Combine and remove duplicates
-            combined_df = pd.concat([existing_df, df], ignore_index=True)
-            combined_df = combined_df.drop_duplicates(
-                subset=["timestamp", "source", "latitude", "longitude", "parameter"],
-                keep="last"
-            )
-            combined_df = combined_df.sort_values("timestamp").reset_index(drop=True)
+            # Dedup within the new batch, then skip rows already stored.
+            # Only the key columns of the history are read, and only new rows
+            # are written, so append cost scales with the batch size.
+            df = df.drop_duplicates(subset=KEY_COLS, keep="last")
+            df = drop_existing_measurements(df, read_existing_keys(filepath))
             
-            combined_df.to_csv(filepath, index=False)
-            logger.info(f"Appended data to {filepath} (total rows: {len(combined_df)})")
+            df.to_csv(filepath, mode="a", header=False, index=False)
+            logger.info(f"Appended {len(df)} new rows to {filepath}")
         else:
             df.to_csv(filepath, index=False)
             logger.info(f"Saved data to {filepath} ({len(df)} rows)")
@@ -481,7 +564,12 @@ def save_to_csv(df: pd.DataFrame, filename: str = Config.OUTPUT_FILE, append: bo
 # MAIN ORCHESTRATION
 # =============================================================================
 
-async def collect_all_data(lat: float, lon: float, radius: int = Config.DEFAULT_RADIUS) -> pd.DataFrame:
+async def collect_all_data(
+    lat: float,
+    lon: float,
+    radius: int = Config.DEFAULT_RADIUS,
+    client: Optional[AsyncClient] = None
+) -> pd.DataFrame:
     """
     Collect data from all sources concurrently.
     
@@ -489,13 +577,19 @@ async def collect_all_data(lat: float, lon: float, radius: int = Config.DEFAULT_
         lat: Latitude coordinate
         lon: Longitude coordinate
         radius: Search radius for OpenAQ (meters)
+        client: Optional shared httpx AsyncClient (will create if not provided)
     
     Returns:
         Normalized DataFrame with all collected data
     """
     logger.info(f"Starting data collection for location ({lat}, {lon})")
     
-    async with AsyncClient(timeout=Config.TIMEOUT) as client:
+    should_close = False
+    if client is None:
+        client = AsyncClient(timeout=Config.TIMEOUT)
+        should_close = True
+    
+    try:
         # Fetch data from all sources concurrently
         tasks = [
             fetch_openaq_data(lat, lon, radius, client),
@@ -504,17 +598,20 @@ async def collect_all_data(lat: float, lon: float, radius: int = Config.DEFAULT_
         ]
         
         results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Combine all measurements
-        all_measurements = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                logger.error(f"Task {i} failed with exception: {result}")
-            else:
-                all_measurements.extend(result)
+    finally:
+        if should_close:
+            await client.aclose()
+    
+    # Combine all measurement batches
+    batches = []
+    for i, result in enumerate(results):
+        if isinstance(result, Exception):
+            logger.error(f"Task {i} failed with exception: {result}")
+        else:
+            batches.append(result)
     
     # Normalize to DataFrame
-    df = normalize_data(all_measurements)
+    df = normalize_data(batches)
     
     return df
 
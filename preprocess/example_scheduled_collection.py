@@ -8,9 +8,12 @@ for multiple cities using the air quality data collection module.
 import asyncio
 import logging
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
 from pathlib import Path
 
+import httpx
+import pandas as pd
+
 from preprocess.collect_air_quality_data import collect_all_data, save_to_csv, Config
 
 # Configure logging
@@ -29,13 +32,25 @@ CITIES = [
     {"name": "Phoenix", "lat": 33.4484, "lon": -112.0740, "radius": 25000},
 ]
 
+# Maximum number of cities collected at the same time (each city issues
+# several API calls), and connection cap for the shared HTTP client
+MAX_CONCURRENT_CITIES = 8
+MAX_CONNECTIONS = 32
+
+# Combined output file for all cities (relative to Config.DATA_DIR)
+OUTPUT_FILE = "air_quality_all.csv"
+
 
-async def collect_for_city(city: Dict) -> None:
+async def collect_for_city(city: Dict, client: httpx.AsyncClient) -> Optional[pd.DataFrame]:
     """
     Collect air quality data for a single city.
     
     Args:
         city: Dictionary with city name, lat, lon, and radius
+        client: Shared httpx AsyncClient
+    
+    Returns:
+        DataFrame tagged with a "city" column, or None if nothing was collected
     """
     logger.info(f"Starting collection for {city['name']}")
     
@@ -44,20 +59,21 @@ async def collect_for_city(city: Dict) -> None:
         df = await collect_all_data(
             lat=city["lat"],
             lon=city["lon"],
-            radius=city["radius"]
+            radius=city["radius"],
+            client=client
         )
         
         if not df.empty:
-            # Save to city-specific CSV file
-            filename = f"air_quality_{city['name'].lower().replace(' ', '_')}.csv"
-            save_to_csv(df, filename=filename, append=True)
-            
+            df["city"] = city["name"]
             logger.info(f"✓ {city['name']}: Collected {len(df)} records")
-        else:
-            logger.warning(f"⚠ {city['name']}: No data collected")
+            return df
+        
+        logger.warning(f"⚠ {city['name']}: No data collected")
     
     except Exception as e:
         logger.error(f"✗ {city['name']}: Collection failed - {str(e)}")
+    
+    return None
 
 
 async def collect_all_cities() -> None:
@@ -69,9 +85,27 @@ async def collect_all_cities() -> None:
     logger.info(f"Cities: {len(CITIES)}")
     logger.info("=" * 80)
     
-    # Run collections concurrently
-    tasks = [collect_for_city(city) for city in CITIES]
-    await asyncio.gather(*tasks)
+    # Run collections concurrently, at most MAX_CONCURRENT_CITIES at a time,
+    # over one shared connection pool
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_CITIES)
+    
+    async def bounded(city: Dict, client: httpx.AsyncClient) -> Optional[pd.DataFrame]:
+        async with semaphore:
+            return await collect_for_city(city, client)
+    
+    limits = httpx.Limits(max_connections=MAX_CONNECTIONS)
+    async with httpx.AsyncClient(timeout=Config.TIMEOUT, limits=limits) as client:
+        tasks = [bounded(city, client) for city in CITIES]
+        dfs = await asyncio.gather(*tasks)
+    
+    # Single write for all cities instead of one CSV append per city
+    dfs = [df for df in dfs if df is not None and not df.empty]
+    if dfs:
+        combined = pd.concat(dfs, ignore_index=True)
+        save_to_csv(combined, filename=OUTPUT_FILE, append=True)
+        logger.info(f"Saved {len(combined)} records from {len(dfs)} cities to {OUTPUT_FILE}")
+    else:
+        logger.warning("No data collected for any city")
     
     logger.info("=" * 80)
     logger.info("MULTI-CITY DATA COLLECTION COMPLETED")
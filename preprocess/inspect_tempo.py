@@ -0,0 +1,88 @@
+"""
+Quick script to inspect TEMPO NetCDF file structure
+====================================================
+Walks the root group and every subgroup in a single netCDF4 pass, printing
+dimensions, variable shapes and attributes. Only metadata is read.
+
+Usage:
+    python inspect_tempo.py [FILE] [--xarray]
+"""
+import argparse
+
+import netCDF4 as nc4
+
+DEFAULT_FILE = 'tempo_data_nyc/TEMPO_NO2_L2_NRT_V02_20251003T234442Z_S014G06.nc'
+
+
+def print_group(group, indent=0):
+    """
+    Print one group's dimensions, variables and attributes, then recurse into subgroups.
+
+    Args:
+        group: netCDF4 Dataset or Group
+        indent: Indentation level for nested groups
+    """
+    pad = "   " * indent
+    print(f"{pad}Dimensions: { {name: len(dim) for name, dim in group.dimensions.items()} }")
+
+    for name, var in group.variables.items():
+        # var.shape / var.dimensions come from the header; no data is read
+        print(f"{pad}  - {name}")
+        print(f"{pad}    Shape: {var.shape}")
+        print(f"{pad}    Dims: {var.dimensions}")
+        attrs = var.ncattrs()
+        if attrs:
+            print(f"{pad}    Attrs: {attrs[:5]}")
+
+    for name, subgroup in group.groups.items():
+        print(f"\n{pad}📁 GROUP: {subgroup.path}")
+        print_group(subgroup, indent + 1)
+
+
+def inspect_netcdf4(filepath):
+    """Report root, groups and variables of a NetCDF file in one traversal."""
+    with nc4.Dataset(filepath, 'r') as ds:
+        print("\nROOT LEVEL:")
+        print_group(ds)
+
+        print("\n" + "=" * 80)
+        print("\nGLOBAL ATTRIBUTES:")
+        for attr in ds.ncattrs()[:10]:
+            print(f"  - {attr}: {ds.getncattr(attr)}")
+
+
+def inspect_xarray(filepath):
+    """Print the xarray view of the root group and each top-level group."""
+    try:
+        import xarray as xr
+    except ImportError:
+        print("❌ xarray not installed. Install with: pip install xarray dask")
+        return
+
+    with nc4.Dataset(filepath, 'r') as ds:
+        groups = [None] + list(ds.groups.keys())
+
+    for group in groups:
+        # Lazy (dask-backed) and undecoded: only metadata is read
+        with xr.open_dataset(filepath, group=group, chunks={},
+                             decode_cf=False, mask_and_scale=False) as ds:
+            print(f"\n📁 {group or 'ROOT'} (xarray):")
+            print(ds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect TEMPO NetCDF file structure")
+    parser.add_argument("filepath", nargs="?", default=DEFAULT_FILE,
+                        help=f"NetCDF file to inspect (default: {DEFAULT_FILE})")
+    parser.add_argument("--xarray", action="store_true",
+                        help="Also print the xarray view of each group (requires xarray + dask)")
+    args = parser.parse_args()
+
+    print(f"\nInspecting: {args.filepath}\n")
+    print("=" * 80)
+
+    inspect_netcdf4(args.filepath)
+
+    if args.xarray:
+        print("\n" + "=" * 80)
+        inspect_xarray(args.filepath)
@@ -1,17 +1,37 @@
 """
 TEMPO NO₂ Data Processing Script
 =================================
-Process downloaded TEMPO .nc files and extract NO₂ data for specific coordinates (NYC).
-Creates a time-series CSV file from multiple NetCDF files.
+Process downloaded TEMPO .nc files and extract NO₂ data for specific coordinates (NYC
+by default; several targets can be extracted from each granule in one pass).
+Creates a time-series Parquet (or CSV) file from multiple NetCDF files.
 """
 
+import json
 import os
-import xarray as xr
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import netCDF4 as nc4
 import pandas as pd
 from datetime import datetime
 from pathlib import Path
 import logging
 
+# Optional: JIT-compiled nearest-pixel scan
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Optional: threaded, cache-blocked evaluation of the distance expression
+try:
+    import numexpr as ne
+    ne.set_num_threads(os.cpu_count())
+    NUMEXPR_AVAILABLE = True
+except ImportError:
+    NUMEXPR_AVAILABLE = False
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -30,77 +50,286 @@ TEMPO_DATA_DIR = 'tempo_data_nyc/'
 TARGET_LAT = 40.7128
 TARGET_LON = -74.0060
 
-# Output file
-OUTPUT_CSV = 'tempo_nyc_timeseries.csv'
+# Output file (.parquet, or .csv for the plain-text writer)
+OUTPUT_FILE = 'tempo_nyc_timeseries.parquet'
+
+# Stride of the coarse lat/lon pre-scan used to locate the search window
+COARSE_STRIDE = 16
+
+# Per-variable HDF5 chunk cache, large enough to hold every chunk touched by the
+# coarse scan so the fine-window and single-pixel reads never re-inflate a chunk
+CHUNK_CACHE = dict(size=16 * 1024 * 1024, nelems=521, preemption=0.75)
+
+# Persistent cache of resolved pixel indices, keyed by granule and geolocation
+# fingerprint; kept inside the data directory next to the granules it indexes
+INDEX_CACHE_FILE = '.tempo_idx_cache.json'
+
+# A cached pixel is only trusted if it lies within about one TEMPO pixel
+# (~2 x 4.75 km at nadir) of the target; otherwise it is searched again
+MAX_PIXEL_OFFSET_KM = 5.0
+EARTH_RADIUS_KM = 6371.0
+
+# Numeric layout of one extracted record (one slot per input file and target)
+RECORD_DTYPE = np.dtype([
+    ('timestamp', 'datetime64[ns]'),
+    ('no2_value', 'f8'),
+    ('latitude', 'f8'),
+    ('longitude', 'f8'),
+    ('target_lat', 'f8'),
+    ('target_lon', 'f8'),
+])
+
+# =============================================================================
+# PIXEL INDEX CACHE
+# =============================================================================
+
+def load_index_cache(path: str) -> dict:
+    """Load the fingerprint -> [mirror_idx, xtrack_idx] cache (empty if missing)."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_index_cache(cache: dict, path: str) -> None:
+    """Write the index cache atomically (temp file + rename)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, path)
+
+
+def swath_geometry(lat_var, lon_var) -> list:
+    """Cheap description of a swath geometry: grid shape and corner coordinates."""
+    corners = [
+        float(np.ma.filled(var[i, j], np.nan))
+        for var in (lat_var, lon_var)
+        for i, j in ((0, 0), (-1, -1))
+    ]
+    return [list(lat_var.shape), corners]
+
+
+def granule_identity(filepath: str) -> list:
+    """Identity of a granule file: basename and size in bytes."""
+    return [os.path.basename(filepath), os.path.getsize(filepath)]
+
+
+def geolocation_fingerprint(granule: list, geometry: list, target_lat: float, target_lon: float) -> str:
+    """Index cache key for one target within one granule's swath geometry."""
+    return json.dumps([*granule, *geometry, [float(target_lat), float(target_lon)]])
+
+
+# Cached indices for the current run, handed to every worker by _init_worker
+_INDEX_CACHE: dict = {}
 
 # =============================================================================
 # DATA PROCESSING FUNCTIONS
 # =============================================================================
 
-def extract_no2_from_nc(filepath: str, target_lat: float, target_lon: float) -> dict:
+def _read_filled(var, rows: slice, cols: slice) -> np.ndarray:
+    """Read a 2-D hyperslab of a netCDF4 variable with fill values as NaN."""
+    return np.ma.filled(var[rows, cols], np.nan)
+
+
+# Pixels are ranked by the haversine term
+#   a = sin²(Δlat/2) + cos(lat1)·cos(lat2)·sin²(Δlon/2)
+# which is monotonic in great-circle distance, so no sqrt/arcsin is needed.
+
+_HAVERSINE_EXPR = (
+    'sin((lat2 - lat * k) / 2)**2 + cos(lat * k) * cos_lat2 * sin((lon2 - lon * k) / 2)**2'
+)
+
+
+def _haversine_term(lat: np.ndarray, lon: np.ndarray, target_lat, target_lon) -> np.ndarray:
+    """Vectorized haversine term between pixels and target(s) (degrees in, broadcasts)."""
+    if NUMEXPR_AVAILABLE:
+        lat2 = np.radians(target_lat)
+        return ne.evaluate(_HAVERSINE_EXPR, local_dict={
+            'lat': lat, 'lon': lon, 'k': np.pi / 180,
+            'lat2': lat2, 'lon2': np.radians(target_lon), 'cos_lat2': np.cos(lat2),
+        })
+    
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(target_lat), np.radians(target_lon)
+    return np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2)**2
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _nearest_scan(lat, lon, target_lat, target_lon):
+        """Single pass over the grid keeping only the running minimum."""
+        lat2 = np.radians(target_lat)
+        lon2 = np.radians(target_lon)
+        cos_lat2 = np.cos(lat2)
+        best = np.inf
+        bi = bj = 0
+        for i in range(lat.shape[0]):
+            for j in range(lat.shape[1]):
+                lat1 = np.radians(lat[i, j])
+                d = (np.sin((lat2 - lat1) / 2)**2
+                     + np.cos(lat1) * cos_lat2 * np.sin((lon2 - np.radians(lon[i, j])) / 2)**2)
+                if d < best:  # False for NaN pixels
+                    best = d
+                    bi = i
+                    bj = j
+        return bi, bj, best
+
+
+def _distance_km(lat: float, lon: float, target_lat: float, target_lon: float) -> float:
+    """Great-circle distance between a pixel centre and a target (NaN for fill values)."""
+    a = _haversine_term(np.asarray(lat), np.asarray(lon), target_lat, target_lon)
+    return float(2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a)))
+
+
+def _pixel_coords(lat_var, lon_var, idx) -> tuple:
+    """Read the latitude and longitude of a single pixel."""
+    i, j = idx
+    return (float(np.ma.filled(lat_var[i, j], np.nan)),
+            float(np.ma.filled(lon_var[i, j], np.nan)))
+
+
+def _nearest_index(lat: np.ndarray, lon: np.ndarray, target_lat: float, target_lon: float) -> tuple:
+    """Index of the pixel closest to the target (NaN pixels are ignored)."""
+    if NUMBA_AVAILABLE:
+        i, j, best = _nearest_scan(lat, lon, target_lat, target_lon)
+        if best == np.inf:
+            raise ValueError("No valid latitude/longitude pixels")
+        return i, j
+    
+    a = _haversine_term(lat, lon, target_lat, target_lon)
+    return np.unravel_index(np.nanargmin(a), a.shape)
+
+
+def find_nearest_pixels(lat_var, lon_var, target_lats: np.ndarray, target_lons: np.ndarray,
+                        stride: int = COARSE_STRIDE) -> list:
     """
-    Extract NO₂ data from a single TEMPO NetCDF file for a specific location.
+    Locate the pixels closest to several targets without reading the full lat/lon grids.
+    
+    One strided pre-scan is broadcast against all targets to find their
+    approximate locations, then only a small window around each hit is read at
+    full resolution, so HDF5 skips decompressing chunks outside the windows.
+    
+    Args:
+        lat_var: netCDF4 latitude variable (mirror_step x xtrack)
+        lon_var: netCDF4 longitude variable (mirror_step x xtrack)
+        target_lats: Target latitude coordinates
+        target_lons: Target longitude coordinates
+        stride: Subsampling step of the coarse pre-scan
+    
+    Returns:
+        List of (mirror_idx, xtrack_idx) tuples, one per target
+    """
+    coarse = slice(None, None, stride)
+    lat_c = _read_filled(lat_var, coarse, coarse)
+    lon_c = _read_filled(lon_var, coarse, coarse)
+    
+    # (pixels, targets) distance matrix -> nearest coarse pixel per target
+    a = _haversine_term(lat_c.reshape(-1, 1), lon_c.reshape(-1, 1),
+                        target_lats[None, :], target_lons[None, :])
+    coarse_hits = zip(*np.unravel_index(np.nanargmin(a, axis=0), lat_c.shape))
+    
+    n_rows, n_cols = lat_var.shape
+    indices = []
+    for (i0, j0), target_lat, target_lon in zip(coarse_hits, target_lats, target_lons):
+        # Full-resolution window around the coarse hit, clipped to the grid
+        r0, r1 = max(stride * i0 - stride, 0), min(stride * i0 + stride + 1, n_rows)
+        c0, c1 = max(stride * j0 - stride, 0), min(stride * j0 + stride + 1, n_cols)
+        lat = _read_filled(lat_var, slice(r0, r1), slice(c0, c1))
+        lon = _read_filled(lon_var, slice(r0, r1), slice(c0, c1))
+        
+        i, j = _nearest_index(lat, lon, target_lat, target_lon)
+        indices.append((int(r0) + int(i), int(c0) + int(j)))
+    return indices
+
+
+def extract_no2_from_nc(filepath: str, target_lat, target_lon) -> list:
+    """
+    Extract NO₂ data from a single TEMPO NetCDF file for one or more locations.
+    
+    The granule is opened once regardless of the number of targets.
     
     Args:
         filepath: Path to the .nc file
-        target_lat: Target latitude coordinate
-        target_lon: Target longitude coordinate
+        target_lat: Target latitude coordinate(s)
+        target_lon: Target longitude coordinate(s)
     
     Returns:
-        Dictionary containing timestamp and NO₂ value, or None if extraction fails
+        List with one record dictionary per target, or None if extraction fails
     """
+    target_lats = np.atleast_1d(np.asarray(target_lat, dtype=np.float64))
+    target_lons = np.atleast_1d(np.asarray(target_lon, dtype=np.float64))
+    
     try:
-        # TEMPO L2 files have data in groups
-        # Open the product group for NO₂ data
-        ds_product = xr.open_dataset(filepath, group='product')
-        ds_geo = xr.open_dataset(filepath, group='geolocation')
-        
-        # Get the NO₂ tropospheric column data
-        no2_data = ds_product['vertical_column_troposphere']
-        
-        # Get latitude and longitude arrays
-        lat_data = ds_geo['latitude']
-        lon_data = ds_geo['longitude']
-        time_data = ds_geo['time']
-        
-        # Find the closest pixel to target coordinates
-        # Calculate distance from target for each pixel
-        lat_diff = lat_data - target_lat
-        lon_diff = lon_data - target_lon
-        distance = (lat_diff**2 + lon_diff**2)**0.5
-        
-        # Find the indices of the minimum distance
-        min_idx = distance.argmin()
-        min_idx_coords = divmod(int(min_idx), distance.shape[1])
-        mirror_idx, xtrack_idx = min_idx_coords
-        
-        # Extract NO₂ value at that location
-        no2_value = float(no2_data.isel(mirror_step=mirror_idx, xtrack=xtrack_idx).values)
+        # TEMPO L2 files have data in groups; one handle reads only the
+        # variables we need, without xarray's CF decoding of every variable
+        with nc4.Dataset(filepath, 'r') as ds:
+            geo = ds.groups['geolocation']
+            lat_var = geo.variables['latitude']
+            lon_var = geo.variables['longitude']
+            no2_var = ds.groups['product'].variables['vertical_column_troposphere']
+            for var in (lat_var, lon_var, no2_var):
+                var.set_var_chunk_cache(**CHUNK_CACHE)
+            
+            # Reuse pixel indices for targets already resolved on this granule
+            granule = granule_identity(filepath)
+            geometry = swath_geometry(lat_var, lon_var)
+            fingerprints = [
+                geolocation_fingerprint(granule, geometry, tlat, tlon)
+                for tlat, tlon in zip(target_lats, target_lons)
+            ]
+            indices = [_INDEX_CACHE.get(fp) for fp in fingerprints]
+            coords = [None if idx is None else _pixel_coords(lat_var, lon_var, idx) for idx in indices]
+            
+            # Drop cached pixels that are not next to their target (fill values count as far)
+            for k, c in enumerate(coords):
+                if c is not None and not _distance_km(*c, target_lats[k], target_lons[k]) <= MAX_PIXEL_OFFSET_KM:
+                    _INDEX_CACHE.pop(fingerprints[k], None)
+                    indices[k] = coords[k] = None
+            
+            misses = [k for k, idx in enumerate(indices) if idx is None]
+            if misses:
+                # Find the closest pixels to the remaining targets
+                found = find_nearest_pixels(lat_var, lon_var, target_lats[misses], target_lons[misses])
+                for k, idx in zip(misses, found):
+                    indices[k] = list(idx)
+                    coords[k] = _pixel_coords(lat_var, lon_var, idx)
+            
+            # Time is only indexed by mirror_step (1-D, small)
+            time_var = geo.variables['time']
+            times = nc4.num2date(
+                time_var[:][[i for i, _ in indices]],
+                time_var.units,
+                calendar=getattr(time_var, 'calendar', 'standard'),
+                only_use_cftime_datetimes=False,
+                only_use_python_datetimes=True
+            )
+            
+            records = []
+            for k, (mirror_idx, xtrack_idx) in enumerate(indices):
+                # Read only the single NO₂ value at each location
+                record = {
+                    'timestamp': pd.to_datetime(times[k]),
+                    'no2_value': float(np.ma.filled(no2_var[mirror_idx, xtrack_idx], np.nan)),
+                    'latitude': coords[k][0],
+                    'longitude': coords[k][1],
+                    'target_lat': float(target_lats[k]),
+                    'target_lon': float(target_lons[k]),
+                    'unit': 'mol/cm²',
+                    'filename': os.path.basename(filepath)
+                }
+                if k in misses:
+                    # Reported back to the parent, which owns the cache file
+                    record['_cache_entry'] = (fingerprints[k], [mirror_idx, xtrack_idx])
+                records.append(record)
         
-        # Extract coordinates at that location
-        actual_lat = float(lat_data.isel(mirror_step=mirror_idx, xtrack=xtrack_idx).values)
-        actual_lon = float(lon_data.isel(mirror_step=mirror_idx, xtrack=xtrack_idx).values)
+        if logger.isEnabledFor(logging.DEBUG):
+            for record in records:
+                logger.debug("✓ Processed %s NO₂=%.2e t=%s loc=(%.4f, %.4f)",
+                             record['filename'], record['no2_value'], record['timestamp'],
+                             record['latitude'], record['longitude'])
         
-        # Extract timestamp - time is only indexed by mirror_step
-        time_value = time_data.isel(mirror_step=mirror_idx).values
-        timestamp = pd.to_datetime(time_value)
-        
-        # Close datasets
-        ds_product.close()
-        ds_geo.close()
-        
-        logger.info(f"✓ Processed {os.path.basename(filepath)}")
-        logger.info(f"  NO₂: {no2_value:.2e} mol/cm², Time: {timestamp}")
-        logger.info(f"  Location: ({actual_lat:.4f}, {actual_lon:.4f})")
-        
-        return {
-            'timestamp': timestamp,
-            'no2_value': no2_value,
-            'latitude': actual_lat,
-            'longitude': actual_lon,
-            'unit': 'mol/cm²',
-            'filename': os.path.basename(filepath)
-        }
+        return records
     
     except KeyError as e:
         logger.error(f"✗ KeyError in {os.path.basename(filepath)}: {e}")
@@ -108,25 +337,90 @@ def extract_no2_from_nc(filepath: str, target_lat: float, target_lon: float) ->
     
     except Exception as e:
         logger.error(f"✗ Error processing {os.path.basename(filepath)}: {str(e)}")
-        import traceback
         logger.error(traceback.format_exc())
         return None
 
 
+def _init_worker(index_cache: dict) -> None:
+    """Pool initializer: install the index cache; files already run in parallel, so keep numexpr single-threaded."""
+    global _INDEX_CACHE
+    _INDEX_CACHE = index_cache
+    if NUMEXPR_AVAILABLE:
+        ne.set_num_threads(1)
+
+
+def _extract_worker(args: tuple) -> list:
+    """Picklable ProcessPoolExecutor entry point for extract_no2_from_nc."""
+    return extract_no2_from_nc(*args)
+
+
+def save_timeseries_csv(df: pd.DataFrame, output_csv: str) -> str:
+    """
+    Write the extracted time-series with np.savetxt.
+    
+    Only numeric columns go to output_csv (timestamps as int64 nanoseconds);
+    per-row filename and unit strings are written to a "<name>_files.csv"
+    sidecar so the main file stays on the fast numeric path.
+    
+    Args:
+        df: Extracted time-series DataFrame
+        output_csv: Output CSV filename
+    
+    Returns:
+        Path of the sidecar metadata file
+    """
+    timestamp_ns = df['timestamp'].to_numpy('datetime64[ns]').astype('int64')
+    
+    columns = ['no2_value', 'latitude', 'longitude', 'target_lat', 'target_lon']
+    rows = np.rec.fromarrays(
+        [timestamp_ns] + [df[col].to_numpy() for col in columns],
+        names=['timestamp_ns'] + columns
+    )
+    np.savetxt(output_csv, rows, delimiter=',', fmt=['%d', '%.6e', '%.6f', '%.6f', '%.6f', '%.6f'],
+               header=','.join(['timestamp_ns'] + columns), comments='')
+    
+    meta_path = Path(output_csv)
+    meta_path = str(meta_path.with_name(f"{meta_path.stem}_files.csv"))
+    meta = np.column_stack([timestamp_ns.astype(str), df['filename'].to_numpy(str), df['unit'].to_numpy(str)])
+    np.savetxt(meta_path, meta, delimiter=',', fmt='%s',
+               header='timestamp_ns,filename,unit', comments='', encoding='utf-8')
+    
+    return meta_path
+
+
+def save_timeseries(df: pd.DataFrame, output_file: str) -> None:
+    """
+    Save the extracted time-series, choosing the format from the file extension.
+    
+    Parquet (pyarrow, zstd) is the default: columnar, compressed and typed, so
+    downstream readers skip float/timestamp text parsing. A .csv path falls
+    back to save_timeseries_csv.
+    
+    Args:
+        df: Extracted time-series DataFrame
+        output_file: Output filename (.parquet or .csv)
+    """
+    if output_file.endswith('.csv'):
+        meta_path = save_timeseries_csv(df, output_file)
+        logger.info(f"File metadata saved to: {meta_path}")
+    else:
+        df.to_parquet(output_file, engine='pyarrow', compression='zstd', index=False)
+
+
 def process_all_tempo_files(
     data_dir: str,
-    target_lat: float,
-    target_lon: float,
-    output_csv: str
+    target_lat,
+    target_lon,
+    output_file: str
 ) -> pd.DataFrame:
     """
-    Process all TEMPO .nc files in a directory and create a time-series CSV.
+    Process all TEMPO .nc files in a directory and save a time-series file.
     
     Args:
         data_dir: Directory containing .nc files
-        target_lat: Target latitude coordinate
-        target_lon: Target longitude coordinate
-        output_csv: Output CSV filename
+        target_lat: Target latitude coordinate(s)
+        target_lon: Target longitude coordinate(s)
+        output_file: Output filename (.parquet or .csv)
     
     Returns:
         DataFrame with extracted NO₂ time-series data
@@ -156,41 +450,70 @@ def process_all_tempo_files(
     logger.info(f"Found {len(nc_files)} .nc files to process")
     logger.info("-" * 80)
     
-    # Store extracted data records
-    records = []
+    # Files are independent, so decompress and extract them in parallel.
+    # Each L2 granule is its own swath (mirror_step length and geolocation
+    # differ per file), so the collection cannot be concatenated into one
+    # array (Kerchunk/MultiZarrToZarr or xr.open_mfdataset would fail on
+    # conflicting mirror_step sizes) with a single pixel index; every file
+    # is opened once and resolved separately instead.
+    args = [(os.path.join(data_dir, f), target_lat, target_lon) for f in nc_files]
     
-    # Process each file
-    for i, filename in enumerate(nc_files, 1):
-        filepath = os.path.join(data_dir, filename)
-        logger.info(f"[{i}/{len(nc_files)}] Processing: {filename}")
-        
-        # Extract data from file
-        record = extract_no2_from_nc(filepath, target_lat, target_lon)
-        
-        if record is not None:
-            records.append(record)
-        
-        logger.info("")  # Blank line for readability
+    # Pre-allocated slots for every (file, target); `ok` marks successful extractions
+    n_targets = np.size(target_lat)
+    out = np.empty(len(nc_files) * n_targets, dtype=RECORD_DTYPE)
+    ok = np.zeros(len(out), dtype=bool)
+    index_cache_path = data_dir_path / INDEX_CACHE_FILE
+    index_cache = load_index_cache(index_cache_path)
+    new_indices = {}
+    with ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=_init_worker,
+                             initargs=(index_cache,)) as executor:
+        log_every = max(1, len(nc_files) // 100)
+        for i, records in enumerate(executor.map(_extract_worker, args, chunksize=4)):
+            if (i + 1) % log_every == 0 or i + 1 == len(nc_files):
+                logger.info(f"[{i + 1}/{len(nc_files)}] files processed")
+            if records is None:
+                continue
+            for k, record in enumerate(records):
+                entry = record.pop('_cache_entry', None)
+                if entry is not None:
+                    new_indices[entry[0]] = entry[1]
+                slot = i * n_targets + k
+                out[slot] = (
+                    np.datetime64(record['timestamp'], 'ns'),
+                    record['no2_value'],
+                    record['latitude'],
+                    record['longitude'],
+                    record['target_lat'],
+                    record['target_lon'],
+                )
+                ok[slot] = True
+    
+    # Persist newly resolved pixel indices for the next run
+    if new_indices:
+        index_cache.update(new_indices)
+        save_index_cache(index_cache, index_cache_path)
     
     # Convert to DataFrame
-    if not records:
+    if not ok.any():
         logger.warning("No data was successfully extracted from any files")
         return pd.DataFrame()
     
-    df = pd.DataFrame(records)
+    df = pd.DataFrame.from_records(out[ok])
+    df['unit'] = 'mol/cm²'
+    df['filename'] = np.repeat(nc_files, n_targets)[ok]
     
     # Sort by timestamp
     df = df.sort_values('timestamp').reset_index(drop=True)
     
-    # Save to CSV
-    df.to_csv(output_csv, index=False)
+    # Save time-series
+    save_timeseries(df, output_file)
     
     logger.info("=" * 80)
     logger.info("PROCESSING COMPLETE")
     logger.info(f"Total records extracted: {len(df)}")
     logger.info(f"Date range: {df['timestamp'].min()} to {df['timestamp'].max()}")
     logger.info(f"NO₂ range: {df['no2_value'].min():.2e} to {df['no2_value'].max():.2e} molecules/cm²")
-    logger.info(f"Output saved to: {output_csv}")
+    logger.info(f"Output saved to: {output_file}")
     logger.info("=" * 80)
     
     return df
@@ -206,7 +529,7 @@ if __name__ == "__main__":
         data_dir=TEMPO_DATA_DIR,
         target_lat=TARGET_LAT,
         target_lon=TARGET_LON,
-        output_csv=OUTPUT_CSV
+        output_file=OUTPUT_FILE
     )
     
     # Display preview of results
@@ -3,14 +3,17 @@
 Test the FastAPI surface pressure endpoint
 """
 
-import requests
 import json
 from datetime import datetime
 
+import httpx
+
+from local_api_client import MAIN_API_URL, fast_json, sync_client
+
 def test_surface_pressure_endpoint():
     """Test the /api/surface-pressure endpoint"""
     
-    base_url = "http://localhost:8000"
+    base_url = MAIN_API_URL
     endpoint = "/api/surface-pressure"
     
     print("🧪 TESTING FASTAPI SURFACE PRESSURE ENDPOINT")
@@ -56,19 +59,29 @@ def test_surface_pressure_endpoint():
         }
     ]
     
+    # One pooled client, so every test case reuses the same keep-alive connection
+    with sync_client(base_url) as client:
+        run_test_cases(client, endpoint, test_cases)
+    
+    print(f"\n" + "=" * 60)
+    print(f"🏁 ENDPOINT TESTING COMPLETE")
+    print(f"💡 Access API docs at: {base_url}/docs")
+    print(f"=" * 60)
+
+def run_test_cases(client: httpx.Client, endpoint: str, test_cases: list):
+    """Request and report each test case in turn"""
     for i, test_case in enumerate(test_cases, 1):
         print(f"\n🔬 TEST {i}: {test_case['name']}")
         print("-" * 40)
         
         try:
             # Make request
-            url = f"{base_url}{endpoint}"
-            response = requests.get(url, params=test_case['params'], timeout=30)
+            response = client.get(endpoint, params=test_case['params'])
             
             print(f"📊 Status Code: {response.status_code}")
             
             if response.status_code == 200:
-                data = response.json()
+                data = fast_json(response)
                 
                 # Extract key information
                 success = data.get('success', False)
@@ -98,18 +111,13 @@ def test_surface_pressure_endpoint():
                 print(f"❌ Request failed")
                 print(f"📝 Response: {response.text[:200]}...")
                 
-        except requests.exceptions.ConnectionError:
+        except httpx.ConnectError:
             print(f"❌ Connection Error - FastAPI server not running")
             print(f"💡 Start server with: python -m uvicorn main:app --reload --port 8000")
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             print(f"❌ Request timeout")
         except Exception as e:
             print(f"❌ Error: {e}")
-    
-    print(f"\n" + "=" * 60)
-    print(f"🏁 ENDPOINT TESTING COMPLETE")
-    print(f"💡 Access API docs at: http://localhost:8000/docs")
-    print(f"=" * 60)
 
 if __name__ == "__main__":
     test_surface_pressure_endpoint()
\ No newline at end of file
@@ -5,31 +5,96 @@ Examines the actual pressure data structure, values, and time ranges
 """
 
 import httpx
-import json
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import asyncio
-from typing import Dict, Any, List
+import io
+import time
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+import numpy as np
+
+from noaa_client import get_client, close_client, run
+from noaa_pressure import (
+    BASE_URL, UNIT_PREFIX, json, flush_section, parse_valid_time, epoch_ns,
+    get_with_retry, get_grid_info, get_pressure_forecast, get_station_latest,
+)
+
+# Optional: msgspec decodes the observations payload straight into typed
+# structs, materializing only the fields read below
+try:
+    import msgspec
+
+    class PressureValue(msgspec.Struct):
+        value: Optional[float] = None
+        unitCode: str = ""
+
+    class ObservationProperties(msgspec.Struct):
+        timestamp: str = ""
+        barometricPressure: Optional[PressureValue] = None
+
+    class ObservationFeature(msgspec.Struct):
+        properties: ObservationProperties
+
+    class ObservationCollection(msgspec.Struct):
+        features: List[ObservationFeature] = []
+
+    OBSERVATIONS_DECODER = msgspec.json.Decoder(ObservationCollection)
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
 
 # NYC coordinates
 NYC_LAT = 40.7128
 NYC_LON = -74.0060
 
+# Pascal -> hectopascal (millibar)
+PA_TO_HPA = 0.01
+
+# Row labels of the grid pressure statistics, in report order
+STAT_LABELS = ("Minimum:", "Maximum:", "Average:", "Std Dev:", "Range:  ")
+
+# Observations shown from the time-range request; NOAA truncates the
+# FeatureCollection server-side, so only these are transferred and decoded
+OBSERVATION_LIMIT = 10
+
+def decode_observations(content: bytes) -> List[Tuple[str, Optional[float], str]]:
+    """Decode an observations FeatureCollection into (timestamp, pressure, unitCode) rows"""
+    if MSGSPEC_AVAILABLE:
+        rows = []
+        for feature in OBSERVATIONS_DECODER.decode(content).features:
+            props = feature.properties
+            barometric = props.barometricPressure or PressureValue()
+            rows.append((props.timestamp, barometric.value, barometric.unitCode))
+        return rows
+    
+    rows = []
+    for feature in json.loads(content).get("features", []):
+        props = feature.get("properties", {})
+        barometric = props.get("barometricPressure") or {}
+        rows.append((props.get("timestamp", ""), barometric.get("value"), barometric.get("unitCode", "")))
+    return rows
+
+async def fetch_station(station_id: str) -> Union[Dict[str, Any], httpx.HTTPError]:
+    """Fetch the latest observation properties of a station (HTTP errors are returned, not raised)"""
+    try:
+        return await get_station_latest(station_id)
+    except httpx.HTTPError as e:
+        return e
+
 async def analyze_noaa_pressure_data():
     """Detailed analysis of NOAA surface pressure data"""
     
-    async with httpx.AsyncClient(timeout=60.0) as client:
+    client = await get_client()
+    try:
         print("🌪️ DETAILED NOAA SURFACE PRESSURE ANALYSIS FOR NYC")
         print("=" * 70)
         
         # Step 1: Get grid coordinates
-        point_url = f"https://api.weather.gov/points/{NYC_LAT},{NYC_LON}"
+        point_url = f"{BASE_URL}/points/{NYC_LAT},{NYC_LON}"
         print(f"📍 Getting grid coordinates: {point_url}")
         
         try:
-            response = await client.get(point_url)
-            response.raise_for_status()
-            point_data = response.json()
-            properties = point_data.get("properties", {})
+            properties = await get_grid_info(NYC_LAT, NYC_LON)
             
             grid_id = properties.get("gridId")
             grid_x = properties.get("gridX")
@@ -42,228 +107,210 @@ async def analyze_noaa_pressure_data():
             return
         
         # Step 2: Get detailed pressure data from grid endpoint
-        grid_url = f"https://api.weather.gov/gridpoints/{grid_id}/{grid_x},{grid_y}"
-        print(f"\n🔍 Analyzing grid data: {grid_url}")
+        # (each report section is buffered and written in one call)
+        out = io.StringIO()
+        grid_url = f"{BASE_URL}/gridpoints/{grid_id}/{grid_x},{grid_y}"
+        print(f"\n🔍 Analyzing grid data: {grid_url}", file=out)
         
         try:
-            response = await client.get(grid_url)
-            response.raise_for_status()
-            grid_data = response.json()
-            
-            pressure_data = grid_data.get("properties", {}).get("pressure")
+            pressure_data = await get_pressure_forecast(grid_id, grid_x, grid_y)
             
             if pressure_data:
-                print(f"\n📊 PRESSURE DATA ANALYSIS:")
-                print(f"  Units: {pressure_data.get('uom', 'Unknown')}")
+                print(f"\n📊 PRESSURE DATA ANALYSIS:", file=out)
+                uom = pressure_data.get('uom', '')
+                print(f"  Units: {uom or 'Unknown'}", file=out)
                 
                 values = pressure_data.get("values", [])
-                print(f"  Total data points: {len(values)}")
+                print(f"  Total data points: {len(values)}", file=out)
                 
                 if values:
                     # Analyze time range and values
-                    print(f"\n⏰ TIME RANGE ANALYSIS:")
+                    print(f"\n⏰ TIME RANGE ANALYSIS:", file=out)
                     
                     first_time = values[0].get("validTime", "")
                     last_time = values[-1].get("validTime", "") if len(values) > 1 else ""
                     
-                    print(f"  First timestamp: {first_time}")
-                    print(f"  Last timestamp: {last_time}")
-                    
-                    # Parse and analyze time intervals
-                    time_intervals = []
-                    pressure_values = []
+                    print(f"  First timestamp: {first_time}", file=out)
+                    print(f"  Last timestamp: {last_time}", file=out)
                     
-                    for i, value in enumerate(values[:20]):  # Analyze first 20 points
-                        valid_time = value.get("validTime", "")
-                        pressure_val = value.get("value")
-                        
-                        if valid_time and pressure_val is not None:
-                            time_intervals.append(valid_time)
-                            pressure_values.append(pressure_val)
+                    # Parse each validTime once; the display, statistics and
+                    # temporal split below all reuse the parsed points
+                    parsed = [
+                        (parse_valid_time(value["validTime"]), value["value"])
+                        for value in values[:20]  # Analyze first 20 points
+                        if value.get("validTime") and value.get("value") is not None
+                    ]
                     
-                    print(f"\n📈 PRESSURE VALUES (First 10 points):")
-                    for i, (time_str, pressure) in enumerate(zip(time_intervals[:10], pressure_values[:10])):
-                        # Parse time for better display
-                        try:
-                            if "/" in time_str:
-                                time_part = time_str.split("/")[0]
-                            else:
-                                time_part = time_str.split("+")[0]
-                            dt = datetime.fromisoformat(time_part.replace("Z", "+00:00"))
-                            formatted_time = dt.strftime("%Y-%m-%d %H:%M UTC")
-                        except:
-                            formatted_time = time_str
-                        
-                        print(f"  {i+1:2d}. {formatted_time} -> {pressure:8.1f} {pressure_data.get('uom', '')}")
+                    print(f"\n📈 PRESSURE VALUES (First 10 points):", file=out)
+                    rows = [
+                        f"  {i+1:2d}. {dt.strftime('%Y-%m-%d %H:%M UTC')} -> {pressure:8.1f} {uom}"
+                        for i, (dt, pressure) in enumerate(parsed[:10])
+                    ]
+                    print("\n".join(rows), file=out)
                     
                     # Statistical analysis
-                    if pressure_values:
-                        min_pressure = min(pressure_values)
-                        max_pressure = max(pressure_values)
-                        avg_pressure = sum(pressure_values) / len(pressure_values)
+                    if parsed:
+                        pressures = np.fromiter((pressure for _, pressure in parsed), dtype=np.float64, count=len(parsed))
+                        stats = np.array([
+                            pressures.min(), pressures.max(), pressures.mean(), pressures.std(), np.ptp(pressures)
+                        ])
+                        # All five statistics scale linearly, so Pa -> hPa is one vectorized multiply
+                        stats_hpa = stats * PA_TO_HPA
+                        show_hpa = uom.removeprefix(UNIT_PREFIX) == "Pa"
                         
-                        print(f"\n📊 STATISTICAL ANALYSIS (First 20 points):")
-                        print(f"  Minimum: {min_pressure:8.1f} {pressure_data.get('uom', '')}")
-                        print(f"  Maximum: {max_pressure:8.1f} {pressure_data.get('uom', '')}")
-                        print(f"  Average: {avg_pressure:8.1f} {pressure_data.get('uom', '')}")
-                        print(f"  Range:   {max_pressure - min_pressure:8.1f} {pressure_data.get('uom', '')}")
+                        print(f"\n📊 STATISTICAL ANALYSIS (First 20 points):", file=out)
+                        for label, value, value_hpa in zip(STAT_LABELS, stats, stats_hpa):
+                            hpa = f"  ({value_hpa:7.2f} hPa)" if show_hpa else ""
+                            print(f"  {label} {value:8.1f} {uom}{hpa}", file=out)
                     
                     # Check forecast vs current time
-                    print(f"\n🕐 TEMPORAL ANALYSIS:")
-                    now = datetime.now()
-                    forecast_points = 0
-                    current_points = 0
-                    
-                    for time_str in time_intervals:
-                        try:
-                            if "/" in time_str:
-                                time_part = time_str.split("/")[0]
-                            else:
-                                time_part = time_str.split("+")[0]
-                            dt = datetime.fromisoformat(time_part.replace("Z", "+00:00"))
-                            
-                            if dt > now:
-                                forecast_points += 1
-                            else:
-                                current_points += 1
-                        except:
-                            continue
+                    print(f"\n🕐 TEMPORAL ANALYSIS:", file=out)
+                    starts_ns = np.fromiter((epoch_ns(dt) for dt, _ in parsed), dtype=np.int64, count=len(parsed))
+                    forecast_points = int((starts_ns > time.time_ns()).sum())
+                    current_points = len(parsed) - forecast_points
                     
-                    print(f"  Current/Past: {current_points} points")
-                    print(f"  Future/Forecast: {forecast_points} points")
+                    print(f"  Current/Past: {current_points} points", file=out)
+                    print(f"  Future/Forecast: {forecast_points} points", file=out)
                 
             else:
-                print(f"❌ No pressure data found in grid endpoint")
+                print(f"❌ No pressure data found in grid endpoint", file=out)
                 
         except Exception as e:
-            print(f"❌ Grid data error: {e}")
+            print(f"❌ Grid data error: {e}", file=out)
+        flush_section(out)
         
         # Step 3: Test real-time observation data
-        print(f"\n" + "=" * 70)
-        print(f"📡 REAL-TIME OBSERVATION STATIONS ANALYSIS")
-        print(f"=" * 70)
+        out = io.StringIO()
+        print(f"\n" + "=" * 70, file=out)
+        print(f"📡 REAL-TIME OBSERVATION STATIONS ANALYSIS", file=out)
+        print(f"=" * 70, file=out)
         
         # Test the NYC area stations
         stations = ["KNYC", "KLGA", "KEWR", "KJFK", "KTEB"]
         
-        for station_id in stations:
-            print(f"\n🏪 Station: {station_id}")
+        # Fetch all stations concurrently, then report them in order. HTTP
+        # failures come back per station; anything else cancels the siblings
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tasks = [tg.create_task(fetch_station(station_id)) for station_id in stations]
+            results = [task.result() for task in tasks]
+        except ExceptionGroup as eg:
+            print(f"\n❌ Station fetch aborted: {eg.exceptions[0]}", file=out)
+            results = []
+        
+        for station_id, properties in zip(stations, results):
+            print(f"\n🏪 Station: {station_id}", file=out)
             
-            try:
-                obs_url = f"https://api.weather.gov/stations/{station_id}/observations/latest"
-                response = await client.get(obs_url)
-                response.raise_for_status()
-                
-                obs_data = response.json()
-                properties = obs_data.get("properties", {})
-                
-                # Extract pressure data
-                barometric = properties.get("barometricPressure")
-                sea_level = properties.get("seaLevelPressure")
-                timestamp = properties.get("timestamp")
-                
-                print(f"  Timestamp: {timestamp}")
-                
-                if barometric:
-                    value = barometric.get("value")
-                    unit = barometric.get("unitCode", "").replace("wmoUnit:", "")
-                    quality = barometric.get("qualityControl", "Unknown")
-                    print(f"  Barometric Pressure: {value} {unit} (Quality: {quality})")
-                
-                if sea_level:
-                    value = sea_level.get("value")
-                    unit = sea_level.get("unitCode", "").replace("wmoUnit:", "")
-                    quality = sea_level.get("qualityControl", "Unknown")
-                    print(f"  Sea Level Pressure: {value} {unit} (Quality: {quality})")
-                
-                if not barometric and not sea_level:
-                    print(f"  ❌ No pressure data available")
-                    
-            except Exception as e:
-                print(f"  ❌ Error: {e}")
+            if isinstance(properties, httpx.HTTPError):
+                print(f"  ❌ Error: {properties}", file=out)
+                continue
+            
+            # Extract pressure data
+            barometric = properties.get("barometricPressure")
+            sea_level = properties.get("seaLevelPressure")
+            timestamp = properties.get("timestamp")
+            
+            print(f"  Timestamp: {timestamp}", file=out)
+            
+            if barometric:
+                value = barometric.get("value")
+                unit = barometric.get("unitCode", "").removeprefix(UNIT_PREFIX)
+                quality = barometric.get("qualityControl", "Unknown")
+                print(f"  Barometric Pressure: {value} {unit} (Quality: {quality})", file=out)
+            
+            if sea_level:
+                value = sea_level.get("value")
+                unit = sea_level.get("unitCode", "").removeprefix(UNIT_PREFIX)
+                quality = sea_level.get("qualityControl", "Unknown")
+                print(f"  Sea Level Pressure: {value} {unit} (Quality: {quality})", file=out)
+            
+            if not barometric and not sea_level:
+                print(f"  ❌ No pressure data available", file=out)
+        flush_section(out)
         
         # Step 4: Test custom time range with observations
-        print(f"\n" + "=" * 70)
-        print(f"⏰ CUSTOM TIME RANGE TESTING")
-        print(f"=" * 70)
+        out = io.StringIO()
+        print(f"\n" + "=" * 70, file=out)
+        print(f"⏰ CUSTOM TIME RANGE TESTING", file=out)
+        print(f"=" * 70, file=out)
         
         # Test getting historical observations from a station
         station_id = "KNYC"  # NYC Central Park
-        print(f"\n📅 Testing time range requests for {station_id}")
+        print(f"\n📅 Testing time range requests for {station_id}", file=out)
         
         # Try to get observations for the last 24 hours
-        end_time = datetime.utcnow()
+        end_time = datetime.now(timezone.utc)
         start_time = end_time - timedelta(hours=24)
         
         # Format times for NOAA API
         start_iso = start_time.strftime("%Y-%m-%dT%H:%M:%SZ")
         end_iso = end_time.strftime("%Y-%m-%dT%H:%M:%SZ")
         
-        time_range_url = f"https://api.weather.gov/stations/{station_id}/observations?start={start_iso}&end={end_iso}"
-        print(f"🔍 URL: {time_range_url}")
+        time_range_url = f"{BASE_URL}/stations/{station_id}/observations?start={start_iso}&end={end_iso}&limit={OBSERVATION_LIMIT}"
+        print(f"🔍 URL: {time_range_url}", file=out)
         
         try:
-            response = await client.get(time_range_url)
-            print(f"📊 Response Status: {response.status_code}")
+            response = await get_with_retry(client, time_range_url)
+            print(f"📊 Response Status: {response.status_code}", file=out)
             
             if response.status_code == 200:
-                obs_data = response.json()
-                features = obs_data.get("features", [])
+                observations = decode_observations(response.content)
                 
-                print(f"✅ Retrieved {len(features)} observations")
+                print(f"✅ Retrieved {len(observations)} observations (limit {OBSERVATION_LIMIT})", file=out)
                 
                 # Analyze pressure data in time series
                 pressure_series = []
-                for feature in features[:10]:  # First 10 observations
-                    props = feature.get("properties", {})
-                    timestamp = props.get("timestamp")
-                    barometric = props.get("barometricPressure")
-                    
-                    if timestamp and barometric and barometric.get("value"):
+                for timestamp, pressure, unit_code in observations[:OBSERVATION_LIMIT]:
+                    if timestamp and pressure:
                         pressure_series.append({
                             "time": timestamp,
-                            "pressure": barometric.get("value"),
-                            "unit": barometric.get("unitCode", "").replace("wmoUnit:", "")
+                            "pressure": pressure,
+                            "unit": unit_code.removeprefix(UNIT_PREFIX)
                         })
                 
                 if pressure_series:
-                    print(f"\n📈 PRESSURE TIME SERIES (Last {len(pressure_series)} points):")
+                    print(f"\n📈 PRESSURE TIME SERIES (Last {len(pressure_series)} points):", file=out)
+                    rows = []
                     for i, point in enumerate(pressure_series):
                         # Format timestamp
                         try:
                             dt = datetime.fromisoformat(point["time"].replace("Z", "+00:00"))
-                            formatted_time = dt.strftime("%Y-%m-%d %H:%M UTC")
-                        except:
+                            formatted_time = dt.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+                        except ValueError:
                             formatted_time = point["time"]
                         
-                        print(f"  {i+1:2d}. {formatted_time} -> {point['pressure']:8.1f} {point['unit']}")
+                        rows.append(f"  {i+1:2d}. {formatted_time} -> {point['pressure']:8.1f} {point['unit']}")
+                    print("\n".join(rows), file=out)
                 
-                print(f"\n✅ CUSTOM TIME RANGE SUPPORTED: YES")
-                print(f"   - Can request specific time ranges")
-                print(f"   - Historical data available (at least 24h)")
-                print(f"   - Real-time observations included")
+                print(f"\n✅ CUSTOM TIME RANGE SUPPORTED: YES", file=out)
+                print(f"   - Can request specific time ranges", file=out)
+                print(f"   - Historical data available (at least 24h)", file=out)
+                print(f"   - Real-time observations included", file=out)
                 
             else:
-                print(f"❌ Time range request failed: {response.status_code}")
-                print(f"   Response: {response.text[:200]}...")
+                print(f"❌ Time range request failed: {response.status_code}", file=out)
+                print(f"   Response: {response.text[:200]}...", file=out)
                 
         except Exception as e:
-            print(f"❌ Time range test error: {e}")
+            print(f"❌ Time range test error: {e}", file=out)
         
-        print(f"\n" + "=" * 70)
-        print(f"🎯 FINAL CONCLUSIONS")
-        print(f"=" * 70)
+        print(f"\n" + "=" * 70, file=out)
+        print(f"🎯 FINAL CONCLUSIONS", file=out)
+        print(f"=" * 70, file=out)
         
-        print(f"✅ Surface Pressure Available: YES")
-        print(f"✅ Grid Forecast Data: Available with hourly resolution")
-        print(f"✅ Real-time Observations: Available from multiple NYC stations")
-        print(f"✅ Custom Time Ranges: Supported for observations")
-        print(f"✅ Units: Pascal (Pa) - convertible to hPa, inHg, etc.")
-        print(f"\n💡 IMPLEMENTATION RECOMMENDATIONS:")
-        print(f"   1. Use grid forecast for future surface pressure predictions")
-        print(f"   2. Use observation stations for real-time/historical data")
-        print(f"   3. Combine both sources for complete time coverage")
-        print(f"   4. Implement proper unit conversions (Pa -> hPa/mb)")
+        print(f"✅ Surface Pressure Available: YES", file=out)
+        print(f"✅ Grid Forecast Data: Available with hourly resolution", file=out)
+        print(f"✅ Real-time Observations: Available from multiple NYC stations", file=out)
+        print(f"✅ Custom Time Ranges: Supported for observations", file=out)
+        print(f"✅ Units: Pascal (Pa) - convertible to hPa, inHg, etc.", file=out)
+        print(f"\n💡 IMPLEMENTATION RECOMMENDATIONS:", file=out)
+        print(f"   1. Use grid forecast for future surface pressure predictions", file=out)
+        print(f"   2. Use observation stations for real-time/historical data", file=out)
+        print(f"   3. Combine both sources for complete time coverage", file=out)
+        print(f"   4. Implement proper unit conversions (Pa -> hPa/mb)", file=out)
+        flush_section(out)
+    finally:
+        await close_client()
 
 if __name__ == "__main__":
-    asyncio.run(analyze_noaa_pressure_data())
\ No newline at end of file
+    run(analyze_noaa_pressure_data())
\ No newline at end of file
@@ -4,11 +4,17 @@ NOAA Surface Pressure Data Explorer
 Tests availability of surface pressure data for NYC with custom time ranges
 """
 
-import httpx
-import json
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import asyncio
-from typing import Dict, Any, Optional
+import io
+import time
+from typing import Dict, Any
+
+from noaa_client import close_client, run
+from noaa_pressure import (
+    BASE_URL, UNIT_PREFIX, flush_section, parse_valid_time, epoch_ns,
+    get_grid_info, get_grid_data, get_grid_stations, get_station_latest,
+)
 
 # NYC coordinates
 NYC_LAT = 40.7128
@@ -16,28 +22,23 @@ NYC_LON = -74.0060
 
 class NOAASurfacePressureExplorer:
     def __init__(self):
-        self.client = httpx.AsyncClient(timeout=60.0)
         self.grid_info = None
         
     async def __aenter__(self):
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.client.aclose()
+        await close_client()
     
     async def get_grid_info(self, lat: float = NYC_LAT, lon: float = NYC_LON) -> Dict[str, Any]:
         """Get NOAA grid information for coordinates"""
         print(f"\n🌍 Getting NOAA grid info for: {lat}, {lon}")
         
-        point_url = f"https://api.weather.gov/points/{lat},{lon}"
+        point_url = f"{BASE_URL}/points/{lat},{lon}"
         print(f"📍 URL: {point_url}")
         
         try:
-            response = await self.client.get(point_url)
-            response.raise_for_status()
-            
-            data = response.json()
-            properties = data.get("properties", {})
+            properties = await get_grid_info(lat, lon)
             
             self.grid_info = {
                 "gridId": properties.get("gridId"),
@@ -58,8 +59,8 @@ class NOAASurfacePressureExplorer:
             print(f"❌ Error getting grid info: {e}")
             return {}
     
-    async def check_grid_data_endpoint(self) -> Dict[str, Any]:
-        """Check the forecast grid data endpoint for available parameters"""
+    async def check_grid_data_endpoint(self, verbose: bool = False) -> Dict[str, Any]:
+        """Check the forecast grid data endpoint for available parameters (listed only if verbose)"""
         if not self.grid_info or not self.grid_info.get("forecastGridData"):
             print("❌ No grid data URL available")
             return {}
@@ -69,23 +70,25 @@ class NOAASurfacePressureExplorer:
         print(f"📍 URL: {url}")
         
         try:
-            response = await self.client.get(url)
-            response.raise_for_status()
-            
-            data = response.json()
-            properties = data.get("properties", {})
+            properties = await get_grid_data(
+                self.grid_info["gridId"], self.grid_info["gridX"], self.grid_info["gridY"]
+            )
             
             # Extract available parameters
             available_params = list(properties.keys())
-            print(f"\n📊 Available parameters ({len(available_params)}):")
+            pressure_related = [
+                param for param in available_params
+                if 'pressure' in param.lower() or 'barometric' in param.lower()
+            ]
+            print(f"\n📊 Available parameters ({len(available_params)}), "
+                  f"pressure related: {', '.join(pressure_related) or 'none'}")
             
-            pressure_related = []
-            for param in sorted(available_params):
-                if 'pressure' in param.lower() or 'barometric' in param.lower():
-                    pressure_related.append(param)
-                    print(f"  🎯 {param} (PRESSURE RELATED)")
-                else:
-                    print(f"  📈 {param}")
+            if verbose:
+                for param in sorted(available_params):
+                    if param in pressure_related:
+                        print(f"  🎯 {param} (PRESSURE RELATED)")
+                    else:
+                        print(f"  📈 {param}")
             
             # Check if surface pressure is available
             surface_pressure_data = None
@@ -126,46 +129,25 @@ class NOAASurfacePressureExplorer:
         if values:
             print(f"  📊 Number of data points: {len(values)}")
             
-            # Analyze time range
-            times = []
-            pressures = []
-            for value in values[:10]:  # Sample first 10
-                valid_time = value.get("validTime")
-                pressure_value = value.get("value")
-                
-                if valid_time and pressure_value is not None:
-                    times.append(valid_time)
-                    pressures.append(pressure_value)
+            # Parse each validTime once and reuse it for both summaries
+            parsed = [
+                (parse_valid_time(value["validTime"]), value["value"])
+                for value in values[:20]  # Sample first 20
+                if value.get("validTime") and value.get("value") is not None
+            ]
             
-            if times:
+            # Analyze time range
+            sample = parsed[:10]  # Sample first 10
+            if sample:
                 print(f"  ⏰ Sample time range:")
-                print(f"    Start: {times[0]}")
-                print(f"    End: {times[-1]}")
-                print(f"  📈 Sample pressure values: {pressures[:5]}")
+                print(f"    Start: {sample[0][0].isoformat()}")
+                print(f"    End: {sample[-1][0].isoformat()}")
+                print(f"  📈 Sample pressure values: {[pressure for _, pressure in sample[:5]]}")
             
             # Check for historical vs forecast data
-            now = datetime.now()
-            forecast_count = 0
-            historical_count = 0
-            
-            for value in values[:20]:  # Sample first 20
-                valid_time_str = value.get("validTime", "")
-                if valid_time_str:
-                    try:
-                        # Parse ISO 8601 time
-                        if "/" in valid_time_str:
-                            time_part = valid_time_str.split("/")[0]
-                        else:
-                            time_part = valid_time_str.split("+")[0].split("-")[0]
-                        
-                        value_time = datetime.fromisoformat(time_part.replace("Z", "+00:00"))
-                        
-                        if value_time > now:
-                            forecast_count += 1
-                        else:
-                            historical_count += 1
-                    except:
-                        continue
+            now_ns = time.time_ns()
+            forecast_count = sum(epoch_ns(dt) > now_ns for dt, _ in parsed)
+            historical_count = len(parsed) - forecast_count
             
             print(f"  📅 Data distribution (sample of {forecast_count + historical_count}):")
             print(f"    Historical: {historical_count}")
@@ -182,27 +164,23 @@ class NOAASurfacePressureExplorer:
         print(f"📍 URL: {url}")
         
         try:
-            response = await self.client.get(url)
-            response.raise_for_status()
-            
-            data = response.json()
-            features = data.get("features", [])
+            all_station_ids = await get_grid_stations(
+                self.grid_info["gridId"], self.grid_info["gridX"], self.grid_info["gridY"]
+            )
             
-            print(f"🏪 Found {len(features)} observation stations")
+            print(f"🏪 Found {len(all_station_ids)} observation stations")
             
-            # Test first few stations for pressure data
-            pressure_stations = []
-            for i, station in enumerate(features[:3]):  # Test first 3 stations
-                station_id = station.get("properties", {}).get("stationIdentifier")
-                if station_id:
-                    print(f"\n🔍 Testing station {i+1}: {station_id}")
-                    station_data = await self.test_observation_station(station_id)
-                    if station_data.get("has_pressure"):
-                        pressure_stations.append(station_id)
+            # Test first few stations for pressure data, concurrently
+            station_ids = all_station_ids[:3]  # Test first 3 stations
+            print(f"\n🔍 Testing stations: {', '.join(station_ids)}")
+            async with asyncio.TaskGroup() as tg:
+                tasks = [tg.create_task(self.test_observation_station(station_id)) for station_id in station_ids]
+            results = [task.result() for task in tasks]
+            pressure_stations = [r["station_id"] for r in results if r.get("has_pressure")]
             
             return {
-                "total_stations": len(features),
-                "tested_stations": min(3, len(features)),
+                "total_stations": len(all_station_ids),
+                "tested_stations": len(station_ids),
                 "pressure_stations": pressure_stations
             }
             
@@ -212,17 +190,12 @@ class NOAASurfacePressureExplorer:
     
     async def test_observation_station(self, station_id: str) -> Dict[str, Any]:
         """Test a specific observation station for pressure data"""
-        print(f"  📡 Testing station: {station_id}")
-        
-        # Get latest observations
-        obs_url = f"https://api.weather.gov/stations/{station_id}/observations/latest"
-        
         try:
-            response = await self.client.get(obs_url)
-            response.raise_for_status()
+            # Get latest observations
+            properties = await get_station_latest(station_id)
             
-            data = response.json()
-            properties = data.get("properties", {})
+            # Print only once the response is in, so concurrent tests don't interleave
+            print(f"  📡 Testing station: {station_id}")
             
             # Check for pressure measurements
             barometric_pressure = properties.get("barometricPressure")
@@ -234,11 +207,11 @@ class NOAASurfacePressureExplorer:
                 print(f"    ✅ Has pressure data!")
                 if barometric_pressure:
                     value = barometric_pressure.get("value")
-                    unit = barometric_pressure.get("unitCode")
+                    unit = barometric_pressure.get("unitCode", "").removeprefix(UNIT_PREFIX)
                     print(f"      🌡️ Barometric: {value} {unit}")
                 if sea_level_pressure:
                     value = sea_level_pressure.get("value")
-                    unit = sea_level_pressure.get("unitCode")
+                    unit = sea_level_pressure.get("unitCode", "").removeprefix(UNIT_PREFIX)
                     print(f"      🌊 Sea Level: {value} {unit}")
             else:
                 print(f"    ❌ No pressure data")
@@ -251,6 +224,7 @@ class NOAASurfacePressureExplorer:
             }
             
         except Exception as e:
+            print(f"  📡 Testing station: {station_id}")
             print(f"    ❌ Error testing station: {e}")
             return {"station_id": station_id, "has_pressure": False}
     
@@ -261,13 +235,13 @@ class NOAASurfacePressureExplorer:
         # This would require historical data API which NOAA may not provide
         # Most NOAA APIs focus on current conditions and forecasts
         
-        now = datetime.utcnow()
+        now = datetime.now(timezone.utc)
         start_time = now - timedelta(hours=hours_back)
         end_time = now + timedelta(hours=hours_forward)
         
         print(f"  📅 Requested range:")
-        print(f"    Start: {start_time.isoformat()}Z")
-        print(f"    End: {end_time.isoformat()}Z")
+        print(f"    Start: {start_time.isoformat()}")
+        print(f"    End: {end_time.isoformat()}")
         
         # NOAA doesn't typically provide historical weather data through their weather API
         # Their historical data is usually accessed through different services
@@ -281,7 +255,7 @@ class NOAASurfacePressureExplorer:
             "forecast_available": True
         }
 
-async def main():
+async def main(verbose: bool = False):
     """Main test function"""
     print("🌪️ NOAA Surface Pressure Data Explorer for NYC")
     print("=" * 60)
@@ -299,7 +273,7 @@ async def main():
         print("🔍 CHECKING FORECAST GRID DATA ENDPOINT")
         print("=" * 60)
         
-        grid_results = await explorer.check_grid_data_endpoint()
+        grid_results = await explorer.check_grid_data_endpoint(verbose=verbose)
         
         # Step 3: Check observation stations
         print("\n" + "=" * 60)
@@ -315,34 +289,44 @@ async def main():
         
         time_range_results = await explorer.test_custom_time_range()
         
-        # Summary
-        print("\n" + "=" * 60)
-        print("📋 SUMMARY")
-        print("=" * 60)
+        # Summary (buffered and written in one call)
+        out = io.StringIO()
+        print("\n" + "=" * 60, file=out)
+        print("📋 SUMMARY", file=out)
+        print("=" * 60, file=out)
         
-        print(f"✅ Grid Info Retrieved: {bool(grid_info)}")
-        print(f"📊 Grid Data Parameters: {len(grid_results.get('available_parameters', []))}")
-        print(f"🎯 Pressure Parameters Found: {len(grid_results.get('pressure_related', []))}")
-        print(f"🏪 Observation Stations: {station_results.get('total_stations', 0)}")
-        print(f"📡 Stations with Pressure: {len(station_results.get('pressure_stations', []))}")
+        print(f"✅ Grid Info Retrieved: {bool(grid_info)}", file=out)
+        print(f"📊 Grid Data Parameters: {len(grid_results.get('available_parameters', []))}", file=out)
+        print(f"🎯 Pressure Parameters Found: {len(grid_results.get('pressure_related', []))}", file=out)
+        print(f"🏪 Observation Stations: {station_results.get('total_stations', 0)}", file=out)
+        print(f"📡 Stations with Pressure: {len(station_results.get('pressure_stations', []))}", file=out)
         
         # Recommendations
-        print(f"\n🎯 RECOMMENDATIONS:")
+        print(f"\n🎯 RECOMMENDATIONS:", file=out)
         
         if grid_results.get('surface_pressure_data'):
-            print(f"  ✅ Use forecast grid data endpoint for surface pressure forecasts")
-            print(f"     URL pattern: /gridpoints/{{gridId}}/{{x}},{{y}}")
+            print(f"  ✅ Use forecast grid data endpoint for surface pressure forecasts", file=out)
+            print(f"     URL pattern: /gridpoints/{{gridId}}/{{x}},{{y}}", file=out)
         
         if station_results.get('pressure_stations'):
-            print(f"  ✅ Use observation stations for real-time surface pressure")
-            print(f"     Available stations: {', '.join(station_results['pressure_stations'])}")
+            print(f"  ✅ Use observation stations for real-time surface pressure", file=out)
+            print(f"     Available stations: {', '.join(station_results['pressure_stations'])}", file=out)
         
         if not grid_results.get('surface_pressure_data') and not station_results.get('pressure_stations'):
-            print(f"  ❌ Limited surface pressure data available through NOAA Weather API")
-            print(f"  💡 Consider alternative sources:")
-            print(f"     - NOAA NCEI for historical data")
-            print(f"     - OpenWeatherMap API")
-            print(f"     - WeatherAPI.com")
+            print(f"  ❌ Limited surface pressure data available through NOAA Weather API", file=out)
+            print(f"  💡 Consider alternative sources:", file=out)
+            print(f"     - NOAA NCEI for historical data", file=out)
+            print(f"     - OpenWeatherMap API", file=out)
+            print(f"     - WeatherAPI.com", file=out)
+        
+        flush_section(out)
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Explore NOAA surface pressure data for NYC")
+    parser.add_argument("--verbose", action="store_true",
+                        help="List every parameter of the forecast grid data endpoint")
+    args = parser.parse_args()
+    
+    run(main(verbose=args.verbose))
\ No newline at end of file
@@ -1,93 +1,142 @@
 #!/usr/bin/env python3
 """
 Quick test script for O3 prediction endpoint
+Usage: python test_o3_prediction.py ["Location" ...]  (default: New York City)
+All locations are requested concurrently over one client.
 """
 
-import requests
+import asyncio
 import json
+import sys
 from datetime import datetime
 
-print("🧪 Testing O3 Prediction System")
-print("=" * 60)
+import httpx
 
-# Test endpoint
-url = "http://localhost:8001/predict-o3"
-params = {"location": "New York City"}
-
-print(f"\n📍 Making request to: {url}")
-print(f"📍 Location: {params['location']}")
-print("\n⏳ Fetching atmospheric data and predicting O3...")
-print("   (This may take 10-15 seconds for Gemini to search...)\n")
+from local_api_client import GEMINI_API_URL as BASE_URL, TIMEOUT, async_client, fast_json
 
+# Optional: orjson pretty-prints the (large) saved responses several times faster
 try:
-    response = requests.get(url, params=params, timeout=30)
-    
-    if response.status_code == 200:
-        data = response.json()
-        
-        print("=" * 60)
-        print("✅ SUCCESS!")
-        print("=" * 60)
-        
-        if data.get('success'):
-            # Display prediction
-            print(f"\n🎯 O3 PREDICTION: {data.get('o3_prediction', 'N/A')} {data.get('unit', 'ppb')}")
-            print(f"📊 Confidence: {data.get('confidence', 'unknown').upper()}")
-            print(f"🤖 Model: {data.get('model_type', 'unknown')}")
-            print(f"📍 Location: {data.get('location', 'unknown')}")
-            
-            # Display atmospheric data
-            if 'atmospheric_data' in data:
-                atm = data['atmospheric_data']
-                print(f"\n🌍 ATMOSPHERIC DATA:")
-                print(f"   Timestamp: {atm.get('query_timestamp', 'unknown')}")
-                
-                if 'parameters' in atm:
-                    print(f"\n   Parameters Used:")
-                    for param, details in atm['parameters'].items():
-                        if isinstance(details, dict):
-                            value = details.get('value', 'N/A')
-                            unit = details.get('unit', '')
-                            source = details.get('source', 'N/A')
-                            confidence = details.get('confidence', 'unknown')
-                            
-                            # Emoji for confidence
-                            conf_emoji = '✅' if confidence == 'high' else '⚠️' if confidence == 'medium' else '❓'
-                            
-                            print(f"   {conf_emoji} {param}: {value} {unit}")
-                            print(f"      Source: {source}")
-                
-                if 'sources' in atm:
-                    print(f"\n   📚 Data Sources:")
-                    for source in atm['sources']:
-                        print(f"      • {source}")
-        else:
-            print(f"\n❌ Prediction failed:")
-            print(f"   Error: {data.get('error', 'Unknown error')}")
-            print(f"   Message: {data.get('message', 'No message')}")
-        
-        # Save full response
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"o3_prediction_test_{timestamp}.json"
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+PATH = "/predict-o3"
+
+DEFAULT_LOCATIONS = ["New York City"]
+
+# Emoji for each parameter confidence level ('❓' for anything else)
+CONF_EMOJI = {'high': '✅', 'medium': '⚠️', 'low': '❓'}
+
+def save_json(data: dict, filename: str) -> None:
+    """Write data as indented JSON"""
+    if ORJSON_AVAILABLE:
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
         with open(filename, 'w') as f:
             json.dump(data, f, indent=2)
-        print(f"\n💾 Full response saved to: {filename}")
-        
+
+async def predict(client: httpx.AsyncClient, location: str) -> dict:
+    """Request an O3 prediction for one location; raises httpx.HTTPStatusError on a non-2xx reply"""
+    response = await client.get(PATH, params={"location": location})
+    response.raise_for_status()
+    return fast_json(response)
+
+def report(location: str, data: dict) -> None:
+    """Print one location's prediction and save the full response"""
+    print("=" * 60)
+    print(f"📍 {location}")
+    print("=" * 60)
+    print("✅ SUCCESS!")
+    print("=" * 60)
+
+    if data.get('success'):
+        # Display prediction
+        print(f"\n🎯 O3 PREDICTION: {data.get('o3_prediction', 'N/A')} {data.get('unit', 'ppb')}")
+        print(f"📊 Confidence: {data.get('confidence', 'unknown').upper()}")
+        print(f"🤖 Model: {data.get('model_type', 'unknown')}")
+        print(f"📍 Location: {data.get('location', 'unknown')}")
+
+        # Display atmospheric data
+        if 'atmospheric_data' in data:
+            atm = data['atmospheric_data']
+            print(f"\n🌍 ATMOSPHERIC DATA:")
+            print(f"   Timestamp: {atm.get('query_timestamp', 'unknown')}")
+
+            if 'parameters' in atm:
+                # Build the whole block, then write it in one call
+                lines = ["\n   Parameters Used:"]
+                for param, details in atm['parameters'].items():
+                    if isinstance(details, dict):
+                        value = details.get('value', 'N/A')
+                        unit = details.get('unit', '')
+                        source = details.get('source', 'N/A')
+                        conf_emoji = CONF_EMOJI.get(details.get('confidence'), '❓')
+
+                        lines.append(f"   {conf_emoji} {param}: {value} {unit}")
+                        lines.append(f"      Source: {source}")
+                sys.stdout.write("\n".join(lines) + "\n")
+
+            if 'sources' in atm:
+                print(f"\n   📚 Data Sources:")
+                for source in atm['sources']:
+                    print(f"      • {source}")
     else:
-        print(f"❌ HTTP Error: {response.status_code}")
-        print(f"Response: {response.text}")
-
-except requests.exceptions.Timeout:
-    print("❌ Request timed out (> 30 seconds)")
-    print("   Gemini search may be taking longer than expected")
-    
-except requests.exceptions.ConnectionError:
-    print("❌ Could not connect to server")
-    print("   Make sure the server is running on http://localhost:8001")
-    
-except Exception as e:
-    print(f"❌ Error: {str(e)}")
-
-print("\n" + "=" * 60)
-print("Test complete!")
-print("=" * 60)
+        print(f"\n❌ Prediction failed:")
+        print(f"   Error: {data.get('error', 'Unknown error')}")
+        print(f"   Message: {data.get('message', 'No message')}")
+
+    # Save full response (one file per location, as they finish in the same second)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    slug = location.lower().replace(" ", "_")
+    filename = f"o3_prediction_test_{slug}_{timestamp}.json"
+    save_json(data, filename)
+    print(f"\n💾 Full response saved to: {filename}")
+
+async def main(locations):
+    print("🧪 Testing O3 Prediction System")
+    print("=" * 60)
+
+    print(f"\n📍 Making requests to: {BASE_URL}{PATH}")
+    print(f"📍 Locations: {', '.join(locations)}")
+    print("\n⏳ Fetching atmospheric data and predicting O3...")
+    print("   (This may take 10-15 seconds for Gemini to search...)\n")
+
+    # One client for every location; the requests overlap, so the total wait
+    # is the slowest location rather than the sum of all of them
+    async with async_client(BASE_URL) as client:
+        results = await asyncio.gather(
+            *(predict(client, location) for location in locations),
+            return_exceptions=True,
+        )
+
+    for location, result in zip(locations, results):
+        if isinstance(result, httpx.ConnectTimeout):
+            print(f"❌ {location}: Connecting timed out (> {TIMEOUT.connect:.0f} seconds)")
+            print(f"   Make sure the server is running on {BASE_URL}")
+        elif isinstance(result, httpx.ReadTimeout):
+            print(f"❌ {location}: Response timed out (> {TIMEOUT.read:.0f} seconds)")
+            print("   Gemini search may be taking longer than expected")
+        elif isinstance(result, httpx.TimeoutException):
+            print(f"❌ {location}: Request timed out ({type(result).__name__})")
+        elif isinstance(result, httpx.ConnectError):
+            print(f"❌ {location}: Could not connect to server")
+            print(f"   Make sure the server is running on {BASE_URL}")
+        elif isinstance(result, httpx.HTTPStatusError):
+            print(f"❌ {location}: HTTP Error: {result.response.status_code}")
+            print(f"Response: {result.response.text}")
+        elif isinstance(result, Exception):
+            print(f"❌ {location}: Error: {str(result)}")
+        else:
+            try:
+                report(location, result)
+            except Exception as e:
+                print(f"❌ {location}: Error: {str(e)}")
+
+    print("\n" + "=" * 60)
+    print("Test complete!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:] or DEFAULT_LOCATIONS))
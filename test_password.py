@@ -3,8 +3,17 @@
 import sys
 sys.path.append('.')
 
+from unittest import mock
+
+import bcrypt
+
+from auth import jwt_handler
 from auth.jwt_handler import get_password_hash, verify_password
 
+# bcrypt's minimum cost: 256x cheaper than the default 12 rounds used in
+# production, which stays untouched. verify_password reads the cost from the hash.
+TEST_ROUNDS = 4
+
 def test_password_hashing():
     # Test passwords
     test_passwords = [
@@ -13,25 +22,30 @@ def test_password_hashing():
         "testuser123"
     ]
     
-    for password in test_passwords:
-        print(f"\nTesting password: '{password}'")
-        print(f"Length: {len(password)} characters, {len(password.encode('utf-8'))} bytes")
+    salt = bcrypt.gensalt(rounds=TEST_ROUNDS)
+    
+    # Round-trip correctness does not need a fresh salt per password, so the
+    # handler's gensalt hands out this one for the duration of the test only
+    with mock.patch.object(jwt_handler.bcrypt, "gensalt", return_value=salt):
+        for password in test_passwords:
+            print(f"\nTesting password: '{password}'")
+            print(f"Length: {len(password)} characters, {len(password.encode('utf-8'))} bytes")
         
-        try:
-            # Hash the password
-            hashed = get_password_hash(password)
-            print(f"Hashed successfully: {hashed[:50]}...")
+            try:
+                # Hash the password
+                hashed = get_password_hash(password)
+                print(f"Hashed successfully: {hashed[:50]}...")
             
-            # Verify the password
-            is_valid = verify_password(password, hashed)
-            print(f"Verification result: {is_valid}")
+                # Verify the password
+                is_valid = verify_password(password, hashed)
+                print(f"Verification result: {is_valid}")
             
-            # Test wrong password
-            wrong_valid = verify_password("wrongpassword", hashed)
-            print(f"Wrong password verification: {wrong_valid}")
+                # Test wrong password
+                wrong_valid = verify_password("wrongpassword", hashed)
+                print(f"Wrong password verification: {wrong_valid}")
             
-        except Exception as e:
-            print(f"Error: {e}")
+            except Exception as e:
+                print(f"Error: {e}")
 
 if __name__ == "__main__":
     test_password_hashing()
\ No newline at end of file
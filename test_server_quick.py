@@ -1,51 +1,73 @@
 #!/usr/bin/env python3
 """Quick test of the FastAPI server and surface pressure endpoint"""
 
-import requests
-import json
+import asyncio
 
-def test_server():
+import httpx
+
+from local_api_client import GEMINI_API_URL as BASE_URL, async_client, fast_json
+
+PATH = "/api/surface-pressure"
+
+# Locations probed concurrently
+PARAM_SETS = [
+    {"lat": 40.7128, "lon": -74.0060, "hours_back": 1, "hours_forward": 0},   # New York City
+    {"lat": 34.0522, "lon": -118.2437, "hours_back": 1, "hours_forward": 0},  # Los Angeles
+]
+
+async def probe(client: httpx.AsyncClient, path: str, params: dict) -> httpx.Response:
+    """GET one endpoint with the given query parameters; raises httpx.HTTPStatusError on a non-2xx reply"""
+    response = await client.get(path, params=params)
+    response.raise_for_status()
+    return response
+
+def report(params: dict, response: httpx.Response) -> None:
+    """Print the outcome of one surface pressure request"""
+    print(f"\n📊 Params: {params}")
+    print(f"📊 Status Code: {response.status_code}")
+
+    data = fast_json(response)
+    print(f"✅ Success: {data.get('success', False)}")
+    print(f"📝 Message: {data.get('message', 'No message')}")
+
+    result_data = data.get('data', {})
+    if result_data:
+        obs_count = len(result_data.get('observation_data', []))
+        print(f"🏪 Observations: {obs_count}")
+
+        if obs_count > 0:
+            latest = result_data['observation_data'][-1]
+            print(f"🌡️ Latest Pressure: {latest.get('pressure_hpa', 'N/A')} hPa")
+            print(f"📡 Station: {latest.get('station', 'N/A')}")
+
+async def test_server():
     try:
         # Test basic health
         print("🧪 Testing FastAPI server...")
-        
+
         # Test the surface pressure endpoint
-        url = "http://localhost:8001/api/surface-pressure"
-        params = {
-            "lat": 40.7128,
-            "lon": -74.0060,
-            "hours_back": 1,
-            "hours_forward": 0
-        }
-        
-        print(f"📡 Testing: {url}")
-        print(f"📊 Params: {params}")
-        
-        response = requests.get(url, params=params, timeout=30)
-        print(f"📊 Status Code: {response.status_code}")
-        
-        if response.status_code == 200:
-            data = response.json()
-            print(f"✅ Success: {data.get('success', False)}")
-            print(f"📝 Message: {data.get('message', 'No message')}")
-            
-            result_data = data.get('data', {})
-            if result_data:
-                obs_count = len(result_data.get('observation_data', []))
-                print(f"🏪 Observations: {obs_count}")
-                
-                if obs_count > 0:
-                    latest = result_data['observation_data'][-1]
-                    print(f"🌡️ Latest Pressure: {latest.get('pressure_hpa', 'N/A')} hPa")
-                    print(f"📡 Station: {latest.get('station', 'N/A')}")
-        else:
-            print(f"❌ Error: {response.status_code}")
-            print(f"📝 Response: {response.text[:200]}...")
-            
-    except requests.exceptions.ConnectionError:
+        print(f"📡 Testing: {BASE_URL}{PATH}")
+
+        async with async_client(BASE_URL) as client:
+            responses = await asyncio.gather(
+                *(probe(client, PATH, params) for params in PARAM_SETS),
+                return_exceptions=True,
+            )
+
+        for params, response in zip(PARAM_SETS, responses):
+            if isinstance(response, httpx.HTTPStatusError):
+                print(f"\n📊 Params: {params}")
+                print(f"❌ Error: {response.response.status_code}")
+                print(f"📝 Response: {response.response.text[:200]}...")
+            elif isinstance(response, Exception):
+                raise response
+            else:
+                report(params, response)
+
+    except httpx.ConnectError:
         print("❌ Connection error - server not running or wrong port")
     except Exception as e:
         print(f"❌ Error: {e}")
 
 if __name__ == "__main__":
-    test_server()
\ No newline at end of file
+    asyncio.run(test_server())
@@ -2,23 +2,26 @@
 Quick Test Script - Verify Data Collection Setup
 ================================================
 Run this to quickly verify your environment is set up correctly.
+Pass --offline to only check dependencies and environment variables.
 """
 
+import argparse
 import asyncio
 import sys
+from importlib.util import find_spec
 
 def check_dependencies():
     """Check if all required packages are installed."""
     print("Checking dependencies...")
     
-    required = ["httpx", "pandas", "numpy"]
+    required = ["httpx", "pandas", "numpy", "pyarrow"]
     missing = []
     
+    # find_spec only locates the package; it does not run its (slow) import
     for package in required:
-        try:
-            __import__(package)
+        if find_spec(package) is not None:
             print(f"  ✓ {package}")
-        except ImportError:
+        else:
             print(f"  ✗ {package} - MISSING")
             missing.append(package)
     
@@ -61,43 +64,55 @@ async def test_apis():
     from collect_air_quality_data import (
         fetch_openaq_data,
         fetch_tempo_data,
-        fetch_openweather_forecast
+        fetch_openweather_forecast,
+        num_rows
     )
     
     lat, lon = 40.7128, -74.0060
     
-    # Test OpenWeatherMap
-    print("  Testing OpenWeatherMap API...")
-    ow_data = await fetch_openweather_forecast(lat, lon)
-    if ow_data:
-        print(f"    ✓ OpenWeatherMap: {len(ow_data)} records")
+    # The three APIs are independent, so query them concurrently
+    print("  Testing OpenWeatherMap, OpenAQ and NASA TEMPO APIs...")
+    results = await asyncio.gather(
+        fetch_openweather_forecast(lat, lon),
+        fetch_openaq_data(lat, lon, 25000),
+        fetch_tempo_data(lat, lon),
+        return_exceptions=True
+    )
+    ow_rows, oaq_rows, tempo_rows = (
+        0 if isinstance(result, Exception) else num_rows(result)
+        for result in results
+    )
+    ow_error, oaq_error, tempo_error = (
+        f" ({result})" if isinstance(result, Exception) else ""
+        for result in results
+    )
+    
+    # OpenWeatherMap
+    if ow_rows:
+        print(f"    ✓ OpenWeatherMap: {ow_rows} records")
     else:
-        print(f"    ✗ OpenWeatherMap: No data")
+        print(f"    ✗ OpenWeatherMap: No data{ow_error}")
     
-    # Test OpenAQ
-    print("  Testing OpenAQ API...")
-    oaq_data = await fetch_openaq_data(lat, lon, 25000)
-    if oaq_data:
-        print(f"    ✓ OpenAQ: {len(oaq_data)} records")
+    # OpenAQ
+    if oaq_rows:
+        print(f"    ✓ OpenAQ: {oaq_rows} records")
     else:
-        print(f"    ⚠ OpenAQ: No data (API key may be required)")
+        print(f"    ⚠ OpenAQ: No data (API key may be required){oaq_error}")
     
-    # Test TEMPO
-    print("  Testing NASA TEMPO API...")
-    tempo_data = await fetch_tempo_data(lat, lon)
-    if tempo_data:
-        print(f"    ✓ TEMPO: {len(tempo_data)} records")
+    # TEMPO
+    if tempo_rows:
+        print(f"    ✓ TEMPO: {tempo_rows} records")
     else:
-        print(f"    ⚠ TEMPO: No data (may be temporary network issue)")
+        print(f"    ⚠ TEMPO: No data (may be temporary network issue){tempo_error}")
     
     print()
     
-    total = len(ow_data) + len(oaq_data) + len(tempo_data)
+    total = ow_rows + oaq_rows + tempo_rows
     return total > 0
 
 
-async def main():
-    """Run all checks."""
+async def main(offline: bool = False):
+    """Run all checks (skipping the network tests when offline)."""
     print("\n" + "=" * 60)
     print("AIR QUALITY DATA COLLECTION - SETUP CHECK")
     print("=" * 60 + "\n")
@@ -109,12 +124,19 @@ async def main():
     # Check environment
     check_env_vars()
     
-    # Test APIs
-    success = await test_apis()
+    # Test APIs (test_apis imports the collector, so offline mode never loads it)
+    if offline:
+        print("Skipping API connectivity tests (--offline)\n")
+        success = True
+    else:
+        success = await test_apis()
     
     # Summary
     print("=" * 60)
-    if success:
+    if offline:
+        print("✓ Dependencies and environment checked (API tests skipped).")
+        print("\nRun without --offline to test API connectivity.")
+    elif success:
         print("✓ Setup complete! At least one API is working.")
         print("\nRun the full script with:")
         print("  python collect_air_quality_data.py")
@@ -124,4 +146,8 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Verify the data collection setup")
+    parser.add_argument("--offline", action="store_true",
+                        help="Skip the API connectivity tests")
+    args = parser.parse_args()
+    asyncio.run(main(offline=args.offline))